@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Cold-start benchmarks for the Memory MCP server.
+
+Measures, in fresh interpreters:
+- import time of memory_mcp_server.server, broken down with ``python -X importtime``
+- time from spawning the stdio server to the first ``list_tools`` response
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --output startup.json --baseline previous.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+SERVER_MODULE = "memory_mcp_server.server"
+
+
+def server_env(workspace: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC + os.pathsep + env.get("PYTHONPATH", "")
+    env["CURSOR_MEMORY_BASE_PATH"] = workspace
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Returns (module, self µs, cumulative µs) rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_imports(runs: int, workspace: str) -> Dict[str, Any]:
+    totals = []
+    rows: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {SERVER_MODULE}"],
+            env=server_env(workspace), capture_output=True, text=True, check=True,
+        )
+        rows = parse_importtime(result.stderr)
+        totals.append(next(cumulative for module, _, cumulative in rows if module == SERVER_MODULE) / 1000)
+
+    # Breakdown of the last run: own modules and self time per top-level package
+    own = {module: round(self_us / 1000, 2) for module, self_us, _ in rows if module.startswith("memory_mcp_server")}
+    packages: Dict[str, int] = {}
+    for module, self_us, _ in rows:
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "runs": runs,
+        "p50_ms": round(statistics.median(totals), 2),
+        "min_ms": round(min(totals), 2),
+        "own_modules_self_ms": own,
+        "heaviest_packages_self_ms": {package: round(self_us / 1000, 2) for package, self_us in heaviest},
+    }
+
+
+async def first_list_tools(workspace: str) -> float:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=["-m", SERVER_MODULE], env=server_env(workspace))
+    start = time.perf_counter()
+    async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.list_tools()
+            return (time.perf_counter() - start) * 1000
+
+
+def measure_list_tools(runs: int, workspace: str) -> Dict[str, Any]:
+    latencies = [asyncio.run(first_list_tools(workspace)) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "min_ms": round(min(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", default="bench-startup.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="memory-startup-") as workspace:
+        print(f"🏁 Measuring cold start over {args.runs} runs")
+        imports = measure_imports(args.runs, workspace)
+        print(f"  import {SERVER_MODULE:<26} p50 {imports['p50_ms']:>8.2f} ms")
+        for package, self_ms in imports["heaviest_packages_self_ms"].items():
+            print(f"    {package:<32} {self_ms:>8.2f} ms self")
+        list_tools = measure_list_tools(args.runs, workspace)
+        print(f"  spawn -> first list_tools{'':<14} p50 {list_tools['p50_ms']:>8.2f} ms")
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "import": imports,
+        "first_list_tools": list_tools,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('revision', 'baseline')}:")
+        for key in ("import", "first_list_tools"):
+            previous, current = baseline[key]["p50_ms"], results[key]["p50_ms"]
+            print(f"  {key:<18} p50 {previous:>8.2f} -> {current:>8.2f} ms ({(current - previous) / previous * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
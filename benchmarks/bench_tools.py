@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Latency, memory and payload benchmarks for the Memory MCP server tools.
+
+Generates synthetic .cursor/memory trees and calls the tools through the
+FastMCP instance over an in-memory MCP client session, so timings include
+argument validation and JSON serialization just like a real client call. Each
+tool runs on each profile in its own child process, so the reported peak RSS
+belongs to that tool and profile alone.
+
+Usage:
+    python benchmarks/bench_tools.py --profiles small medium deep
+    python benchmarks/bench_tools.py --profiles many large --output bench.json
+    python benchmarks/bench_tools.py --baseline previous.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Watchers are only started from main(); keep benchmarks on the plain code path
+os.environ.setdefault("CURSOR_MEMORY_WATCH", "off")
+
+KB = 1024
+MB = 1024 * KB
+
+# name: (files, bytes per file, heading depth)
+PROFILES = {
+    "small": (10, 1 * KB, 2),
+    "medium": (100, 64 * KB, 3),
+    "deep": (100, 16 * KB, 6),
+    "many": (10_000, 1 * KB, 2),
+    "large": (10, 10 * MB, 3),
+}
+
+DEFAULT_PROFILES = ["small", "medium", "deep"]
+DEFAULT_TOOLS = ["list_memory_files", "load_memory_files", "search_memory", "build_session_context"]
+
+TOOL_ARGUMENTS = {
+    "search_memory": {"query": "validation handler error", "limit": 5},
+    "build_session_context": {"token_budget": 4000},
+}
+
+WORDS = (
+    "memory pattern handler validation error decision cache index session payment auth "
+    "docker workflow release module context knowledge issue workaround component service"
+).split()
+
+
+def paragraph(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def file_content(rng: random.Random, size: int, depth: int, timestamped: bool) -> str:
+    """Builds markdown of roughly ``size`` bytes with headings nested ``depth`` levels deep."""
+    parts = ["# Synthetic Memory\n_Generated for benchmarks_\n"]
+    length = len(parts[0])
+    section = 0
+    start = datetime(2026, 1, 1)
+    while length < size:
+        if timestamped:
+            heading = f"## {(start + timedelta(minutes=section)).strftime('%Y-%m-%d %H:%M:%S')}"
+        else:
+            level = 2 + section % max(1, depth - 1)
+            heading = f"{'#' * min(level, 6)} Section {section} {rng.choice(WORDS)}"
+        body = paragraph(rng, min(2 * KB, max(64, size // 20)))
+        block = f"\n{heading}\n{body}\n"
+        parts.append(block)
+        length += len(block)
+        section += 1
+    return "".join(parts)
+
+
+def generate_tree(root: str, files: int, size: int, depth: int, seed: int = 42) -> None:
+    """Writes a memory tree: core files plus synthetic topic files split across tiers."""
+    rng = random.Random(seed)
+    short_term = os.path.join(root, ".cursor", "memory", "short-term")
+    long_term = os.path.join(root, ".cursor", "memory", "long-term")
+    rules = os.path.join(root, ".cursor", "rules")
+    for directory in (short_term, long_term, rules):
+        os.makedirs(directory, exist_ok=True)
+
+    core = [
+        (os.path.join(long_term, "project-knowledge.md"), False),
+        (os.path.join(long_term, "known-issues.md"), False),
+        (os.path.join(short_term, "working-memory.md"), True),
+    ]
+    topics = [
+        (os.path.join(short_term if index % 4 == 0 else long_term, f"topic-{index:05d}.md"), index % 4 == 0)
+        for index in range(max(0, files - len(core)))
+    ]
+    for path, timestamped in core + topics:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(file_content(rng, size, depth, timestamped))
+    with open(os.path.join(rules, "intelligent-memory.mdc"), "w", encoding="utf-8") as f:
+        f.write("# Cursor's Intelligent Memory System\n")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def bench_tool(tool: str, iterations: int) -> Dict[str, Any]:
+    """Calls one tool on the tree at CURSOR_MEMORY_BASE_PATH; runs in a child process."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from memory_mcp_server.server import mcp
+
+    arguments = TOOL_ARGUMENTS.get(tool, {})
+    latencies = []
+    response_bytes = 0
+    async with create_connected_server_and_client_session(mcp) as session:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = await session.call_tool(tool, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response_bytes = len(response.model_dump_json())
+            if response.isError:
+                raise RuntimeError(f"{tool} failed: {response.content}")
+    return {
+        "iterations": iterations,
+        "first_ms": round(latencies[0], 3),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "response_bytes": response_bytes,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def run_tool_process(tool: str, iterations: int, root: str) -> Dict[str, Any]:
+    """Benchmarks one tool in a fresh interpreter and returns its results line."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child-tool", tool, "--iterations", str(iterations)],
+        env={**os.environ, "CURSOR_MEMORY_BASE_PATH": root},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{tool} failed on {root}:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def bench_profile(name: str, tools: List[str], iterations: int, workdir: str) -> Dict[str, Any]:
+    files, size, depth = PROFILES[name]
+    root = os.path.join(workdir, name)
+    started = time.perf_counter()
+    generate_tree(root, files, size, depth)
+    generation_seconds = time.perf_counter() - started
+
+    results: Dict[str, Any] = {}
+    for tool in tools:
+        results[tool] = run_tool_process(tool, iterations, root)
+        print(
+            f"  {name:<8} {tool:<24} p50 {results[tool]['p50_ms']:>10.2f} ms"
+            f"  p99 {results[tool]['p99_ms']:>10.2f} ms  {results[tool]['response_bytes']:>12} B"
+            f"  rss {results[tool]['peak_rss_kb']:>9} KB"
+        )
+
+    shutil.rmtree(root, ignore_errors=True)
+    return {
+        "files": files,
+        "bytes_per_file": size,
+        "heading_depth": depth,
+        "generation_seconds": round(generation_seconds, 3),
+        "tools": results,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Prints the p50 change of every tool/profile pair present in both runs."""
+    print(f"\nCompared with {baseline.get('revision', 'baseline')}:")
+    for profile, data in current["profiles"].items():
+        for tool, stats in data["tools"].items():
+            previous = baseline.get("profiles", {}).get(profile, {}).get("tools", {}).get(tool)
+            if not previous or not previous["p50_ms"]:
+                continue
+            change = (stats["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] * 100
+            print(f"  {profile:<8} {tool:<24} p50 {previous['p50_ms']:>10.2f} -> {stats['p50_ms']:>10.2f} ms ({change:+.1f}%)")
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="memory-bench-")
+    try:
+        profiles = {}
+        for name in args.profiles:
+            profiles[name] = bench_profile(name, args.tools, args.iterations, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "profiles": profiles,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=DEFAULT_PROFILES, choices=sorted(PROFILES))
+    parser.add_argument("--tools", nargs="+", default=DEFAULT_TOOLS)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--child-tool", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_tool:
+        print(json.dumps(asyncio.run(bench_tool(args.child_tool, args.iterations))))
+        return
+
+    print(f"🏁 Benchmarking {', '.join(args.tools)} on profiles: {', '.join(args.profiles)}")
+    results = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Compressed, append-only cold storage for archived memory entries."""
+
+import gzip
+import json
+import logging
+import math
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .search import BM25_B, BM25_K1, stem, tokenize
+    from .writer import files_lock
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.search import BM25_B, BM25_K1, stem, tokenize
+    from memory_mcp_server.writer import files_lock
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.jsonl"
+SEGMENT_SUFFIX = ".md.gz"
+ENTRY_SEPARATOR = b"\n\n"
+COMPRESS_LEVEL = 6
+
+# Index row: segment name, member offset, member length, entry start, entry end, source file, timestamp
+IndexRow = Tuple[str, int, int, int, int, str, Optional[str]]
+
+
+class ColdArchive:
+    """
+    Archived entries stored as gzip segments plus a line-per-entry index.
+
+    Every ``append`` adds one gzip member per segment (``<stem>-YYYY-MM.md.gz``)
+    holding the batch's entries, so segments are append-only and ``zcat``
+    prints them as markdown. ``index.jsonl`` records, per entry, the member's
+    offset and length in its segment and the entry's range inside the member;
+    entry ids are index line numbers. Loading an entry reads and inflates
+    just its member. The index is re-read incrementally when it grows.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.index_path = os.path.join(archive_dir, INDEX_NAME)
+        self.rows: List[Optional[IndexRow]] = []
+        self._index_offset = 0
+        self._lock = threading.Lock()
+
+    def segment_name(self, source_path: str, timestamp: datetime) -> str:
+        source = os.path.splitext(os.path.basename(source_path))[0]
+        return f"{source}-{timestamp.strftime('%Y-%m')}{SEGMENT_SUFFIX}"
+
+    def append(self, source_path: str, entries: List[Tuple[datetime, str]]) -> List[str]:
+        """
+        Compresses ``entries`` of ``source_path`` into their monthly segments.
+
+        Returns:
+            The paths of the segments written.
+        """
+        batches: Dict[str, List[Tuple[datetime, bytes]]] = {}
+        for timestamp, text in entries:
+            batches.setdefault(self.segment_name(source_path, timestamp), []).append((timestamp, text.strip("\n").encode("utf-8")))
+        if not batches:
+            return []
+
+        source = os.path.basename(source_path)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        lines = []
+        with files_lock(self.index_path):
+            for segment, batch in batches.items():
+                member_data = bytearray()
+                ranges = []
+                for timestamp, data in batch:
+                    ranges.append((len(member_data), len(member_data) + len(data), timestamp))
+                    member_data += data + ENTRY_SEPARATOR
+                member = gzip.compress(bytes(member_data), compresslevel=COMPRESS_LEVEL)
+                offset = _append_bytes(os.path.join(self.archive_dir, segment), member)
+                for start, end, timestamp in ranges:
+                    row = [segment, offset, len(member), start, end, source, timestamp.strftime("%Y-%m-%d %H:%M:%S")]
+                    lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+            # The index is written last: a crash leaves an unindexed member, never a dangling row
+            _append_bytes(self.index_path, "".join(lines).encode("utf-8"))
+        return [os.path.join(self.archive_dir, segment) for segment in sorted(batches)]
+
+    def refresh(self) -> int:
+        """Reads index rows appended since the last call; returns the number of entries indexed."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.index_path)
+            except FileNotFoundError:
+                self.rows, self._index_offset = [], 0
+                return 0
+            if size < self._index_offset:
+                self.rows, self._index_offset = [], 0
+            if size > self._index_offset:
+                with open(self.index_path, "rb") as f:
+                    f.seek(self._index_offset)
+                    data = f.read(size - self._index_offset)
+                record_bytes_read(len(data))
+                # Only whole lines; a row being appended right now is picked up next time
+                data = data[:data.rfind(b"\n") + 1]
+                for line in data.splitlines():
+                    try:
+                        row = json.loads(line)
+                        self.rows.append(tuple(row) if len(row) == 7 else None)
+                    except ValueError:
+                        self.rows.append(None)
+                self._index_offset += len(data)
+            return sum(1 for row in self.rows if row)
+
+    def _rows(self, file_name: Optional[str] = None) -> List[Tuple[int, IndexRow]]:
+        self.refresh()
+        with self._lock:
+            return [
+                (entry_id, row) for entry_id, row in enumerate(self.rows)
+                if row and (file_name is None or row[5] == file_name)
+            ]
+
+    def _inflate(self, rows: List[Tuple[int, IndexRow]]) -> Dict[int, str]:
+        """Returns the text of each entry, inflating every member involved once."""
+        members: Dict[Tuple[str, int, int], List[Tuple[int, IndexRow]]] = {}
+        for entry_id, row in rows:
+            members.setdefault((row[0], row[1], row[2]), []).append((entry_id, row))
+        texts: Dict[int, str] = {}
+        for (segment, offset, length), member_rows in members.items():
+            try:
+                with open(os.path.join(self.archive_dir, segment), "rb") as f:
+                    f.seek(offset)
+                    data = f.read(length)
+                record_bytes_read(len(data))
+                member = gzip.decompress(data)
+            except (OSError, EOFError) as e:
+                logger.warning(f"Skipping unreadable archive member {segment}@{offset}: {e}")
+                continue
+            for entry_id, row in member_rows:
+                texts[entry_id] = member[row[3]:row[4]].decode("utf-8", errors="replace")
+        return texts
+
+    def describe(self, entry_id: int, row: IndexRow) -> Dict[str, Any]:
+        return {"id": entry_id, "file_name": row[5], "timestamp": row[6], "segment": row[0]}
+
+    def load(self, entry_ids: List[int]) -> List[Dict[str, Any]]:
+        """Returns the archived entries with the given ids, in the order requested."""
+        self.refresh()
+        with self._lock:
+            rows = [(entry_id, self.rows[entry_id]) for entry_id in entry_ids if 0 <= entry_id < len(self.rows) and self.rows[entry_id]]
+        texts = self._inflate(rows)
+        return [{**self.describe(entry_id, row), "content": texts[entry_id]} for entry_id, row in rows if entry_id in texts]
+
+    def search(self, query: str, limit: int = 5, file_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ranks archived entries against ``query`` (BM25 over stemmed tokens).
+
+        Cold entries have no persistent term index, so every member is inflated;
+        this is meant for occasional lookups, not for the hot path.
+        """
+        query_terms = {stem(token) for token in tokenize(query)}
+        rows = self._rows(file_name)
+        if not query_terms or not rows:
+            return []
+        texts = self._inflate(rows)
+        counts = {entry_id: Counter(stem(token) for token in tokenize(text)) for entry_id, text in texts.items()}
+        if not counts:
+            return []
+        average_length = sum(sum(counter.values()) for counter in counts.values()) / len(counts) or 1.0
+        document_frequency = {term: sum(1 for counter in counts.values() if term in counter) for term in query_terms}
+
+        scored = []
+        for entry_id, counter in counts.items():
+            length = sum(counter.values())
+            score = 0.0
+            for term in query_terms:
+                frequency = counter.get(term, 0)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (len(counts) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+            if score > 0:
+                scored.append((score, entry_id))
+        scored.sort(reverse=True)
+
+        rows_by_id = dict(rows)
+        return [
+            {**self.describe(entry_id, rows_by_id[entry_id]), "score": round(score, 4), "content": texts[entry_id]}
+            for score, entry_id in scored[:limit]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        with self._lock:
+            rows = [row for row in self.rows if row]
+        segments = {row[0] for row in rows}
+        compressed = 0
+        for segment in segments:
+            try:
+                compressed += os.path.getsize(os.path.join(self.archive_dir, segment))
+            except OSError:
+                pass
+        return {"entries": len(rows), "segments": len(segments), "compressed_bytes": compressed}
+
+
+def _append_bytes(path: str, data: bytes) -> int:
+    """Appends ``data`` with one write and fsync; returns the offset it was written at."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        offset = os.fstat(fd).st_size
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+        return offset
+    finally:
+        os.close(fd)
@@ -0,0 +1,157 @@
+"""In-process cache for memory file contents and metadata."""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+try:
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.metrics import record_bytes_read
+
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+CacheKey = Tuple[str, int, int]
+
+
+def content_version(content: str) -> str:
+    """Short content hash used as the version token of a memory file."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass
+class FileInfo:
+    """Stat signature and memoized counts for a memory file."""
+    path: str
+    mtime_ns: int
+    size: int
+    line_count: int
+    char_count: int
+    version: str = ""
+
+    @property
+    def key(self) -> CacheKey:
+        return (self.path, self.mtime_ns, self.size)
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+
+class FileCache:
+    """
+    LRU cache of file contents keyed on ``(path, st_mtime_ns, st_size)``.
+
+    Contents are evicted least-recently-used first once ``max_bytes`` is
+    exceeded. Line and character counts are memoized separately and survive
+    content eviction, so metadata-only callers never re-read an unchanged file.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._contents: "OrderedDict[CacheKey, str]" = OrderedDict()
+        self._info: Dict[str, FileInfo] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, path: str, stat: os.stat_result) -> Optional[FileInfo]:
+        info = self._info.get(path)
+        if info and info.mtime_ns == stat.st_mtime_ns and info.size == stat.st_size:
+            return info
+        return None
+
+    def _store(self, key: CacheKey, content: str) -> None:
+        size = key[2]
+        if size > self.max_bytes:
+            return
+        self._contents[key] = content
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            old_key, _ = self._contents.popitem(last=False)
+            self.current_bytes -= old_key[2]
+
+    def _drop(self, path: str) -> None:
+        info = self._info.pop(path, None)
+        if info and self._contents.pop(info.key, None) is not None:
+            self.current_bytes -= info.size
+
+    def read(self, path: str) -> Tuple[FileInfo, str]:
+        """
+        Returns the metadata and content of ``path``, reading it only if it
+        changed since it was last cached.
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            info = self._lookup(path, stat)
+            if info:
+                content = self._contents.get(info.key)
+                if content is not None:
+                    self._contents.move_to_end(info.key)
+                    self.hits += 1
+                    return info, content
+
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        record_bytes_read(stat.st_size)
+        info = FileInfo(
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            line_count=len(content.splitlines()),
+            char_count=len(content),
+            version=content_version(content),
+        )
+        with self._lock:
+            self.misses += 1
+            self._drop(path)
+            self._info[path] = info
+            self._store(info.key, content)
+        return info, content
+
+    def info(self, path: str) -> FileInfo:
+        """Returns metadata for ``path``, reusing memoized counts when the file is unchanged."""
+        stat = os.stat(path)
+        with self._lock:
+            info = self._lookup(path, stat)
+            if info:
+                self.hits += 1
+                return info
+        return self.read(path)[0]
+
+    def cached_info(self, path: str, mtime_ns: int, size: int) -> Optional[FileInfo]:
+        """Returns memoized metadata for a known stat signature without touching the filesystem."""
+        with self._lock:
+            info = self._info.get(path)
+            if info and info.mtime_ns == mtime_ns and info.size == size:
+                self.hits += 1
+                return info
+        return None
+
+    def invalidate(self, path: str) -> None:
+        """Forgets everything cached for ``path``."""
+        with self._lock:
+            self._drop(path)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Forgets everything cached for paths under the ``prefix`` directory."""
+        with self._lock:
+            for path in [path for path in self._info if path.startswith(prefix)]:
+                self._drop(path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached_files": len(self._contents),
+                "cached_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,316 @@
+"""Garbage collection of timestamped working-memory entries."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+try:
+    from .writer import atomic_write
+    from .metrics import record_bytes_read
+    from .archive import ColdArchive
+except ImportError:
+    from memory_mcp_server.writer import atomic_write
+    from memory_mcp_server.metrics import record_bytes_read
+    from memory_mcp_server.archive import ColdArchive
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 3
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ENTRY_HEADING_RE = re.compile(r"^## (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s*$")
+LEVEL2_HEADING_RE = re.compile(r"^## ")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+CONSOLIDATED_RE = re.compile(r"^_Consolidated: seen (\d+) times since (.+?)_\s*$", re.MULTILINE)
+
+# Volatile tokens that make otherwise identical notes differ: timestamps, commit and hex ids.
+# Paths, numbers and quoted values tell notes apart, so they are kept.
+VOLATILE_RE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?\b"
+    r"|\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"
+    r"|\b0x[0-9a-f]+\b"
+    r"|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,40}\b",
+    re.IGNORECASE,
+)
+NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+@dataclass
+class Block:
+    """A level-2 section of a memory file; ``timestamp`` is set for memory_update entries."""
+    text: str
+    timestamp: Optional[datetime] = None
+    count: int = 1
+    first_seen: Optional[str] = None
+
+    @property
+    def body(self) -> str:
+        return CONSOLIDATED_RE.sub("", self.text.split("\n", 1)[1] if "\n" in self.text else "")
+
+
+@dataclass
+class CompactionResult:
+    content: str
+    archived: List[Block] = field(default_factory=list)
+    exact_merged: int = 0
+    near_merged: int = 0
+    entries: int = 0
+
+
+def split_blocks(content: str) -> List[Block]:
+    """Splits content on level-2 headings outside code fences."""
+    blocks: List[Block] = []
+    lines: List[str] = []
+    in_fence = False
+
+    def close() -> None:
+        if lines:
+            blocks.append(make_block("".join(lines)))
+
+    for line in content.splitlines(keepends=True):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        if not in_fence and LEVEL2_HEADING_RE.match(line):
+            close()
+            lines = []
+        lines.append(line)
+    close()
+    return blocks
+
+
+def make_block(text: str) -> Block:
+    match = ENTRY_HEADING_RE.match(text.split("\n", 1)[0])
+    if not match:
+        return Block(text=text)
+    block = Block(text=text, timestamp=datetime.strptime(match.group(1), TIMESTAMP_FORMAT))
+    consolidated = CONSOLIDATED_RE.search(text)
+    if consolidated:
+        block.count = int(consolidated.group(1))
+        block.first_seen = consolidated.group(2)
+    return block
+
+
+def exact_hash(block: Block) -> str:
+    normalized = " ".join(block.body.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def near_hash(block: Block) -> str:
+    """Hash of the entry with timestamps, commit and hex ids, and punctuation removed."""
+    normalized = NON_WORD_RE.sub(" ", VOLATILE_RE.sub(" ", block.body.lower()))
+    return hashlib.sha1(" ".join(normalized.split()).encode("utf-8")).hexdigest()
+
+
+def merge_into(keep: Block, duplicate: Block) -> None:
+    """Folds an older ``duplicate`` into ``keep``, recording how often the note was seen."""
+    keep.count += duplicate.count
+    keep.first_seen = min(
+        duplicate.first_seen or duplicate.timestamp.strftime(TIMESTAMP_FORMAT),
+        keep.first_seen or keep.timestamp.strftime(TIMESTAMP_FORMAT),
+    )
+    text = CONSOLIDATED_RE.sub("", keep.text)
+    stripped = text.rstrip("\n")
+    trailing = text[len(stripped):] or "\n"
+    keep.text = f"{stripped}\n_Consolidated: seen {keep.count} times since {keep.first_seen}_{trailing}"
+
+
+def compact_content(content: str, cutoff: datetime) -> CompactionResult:
+    """
+    Archives entries older than ``cutoff`` and merges duplicate entries.
+
+    Duplicates keep their newest occurrence in place; the older copies folded
+    into it are archived too, so near duplicates lose no text. Non-timestamped
+    sections (``## Current Context`` and friends) are never touched.
+    """
+    blocks = split_blocks(content)
+    result = CompactionResult(content=content)
+    kept: List[Block] = []
+    by_exact: Dict[str, Block] = {}
+    by_near: Dict[str, Block] = {}
+
+    # Walk newest-first so the surviving copy of a duplicate is the latest one
+    for block in reversed(blocks):
+        if block.timestamp is None:
+            kept.append(block)
+            continue
+        result.entries += 1
+        if block.timestamp < cutoff:
+            result.archived.append(block)
+            continue
+        if not block.body.strip():
+            kept.append(block)
+            continue
+        exact, near = exact_hash(block), near_hash(block)
+        survivor = by_exact.get(exact)
+        if survivor is not None:
+            merge_into(survivor, block)
+            result.archived.append(block)
+            result.exact_merged += 1
+            continue
+        survivor = by_near.get(near)
+        if survivor is not None:
+            merge_into(survivor, block)
+            result.archived.append(block)
+            result.near_merged += 1
+            continue
+        by_exact[exact] = block
+        by_near[near] = block
+        kept.append(block)
+
+    kept.reverse()
+    result.archived.reverse()
+    result.content = "".join(block.text for block in kept)
+    if result.content and not result.content.endswith("\n"):
+        result.content += "\n"
+    return result
+
+
+def prefix_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class WorkingMemoryCompactor:
+    """
+    Compacts timestamped memory files and checkpoints how far it got.
+
+    The checkpoint stores, per file, the stat signature and byte offset it
+    was taken at, a hash of every byte before that offset, the oldest entry
+    timestamp and the hashes of surviving entries. An unchanged signature
+    needs no read at all. Otherwise, when the whole prefix still hashes the
+    same and nothing in it has expired, a run only parses the bytes appended
+    since the checkpoint and rewrites the file only if that tail duplicates
+    an earlier entry; any edit inside the prefix forces a full pass.
+    """
+
+    def __init__(self, state_path: str, archive: ColdArchive):
+        self.state_path = state_path
+        self.archive = archive
+        self.state: Dict[str, Any] = {"version": STATE_VERSION, "files": {}}
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == STATE_VERSION:
+                self.state = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable compaction checkpoint {state_path}: {e}")
+
+    def save(self) -> None:
+        atomic_write(self.state_path, json.dumps(self.state))
+
+    def _checkpoint(self, path: str, data: bytes, stat: os.stat_result) -> None:
+        blocks = [block for block in split_blocks(data.decode("utf-8")) if block.timestamp]
+        oldest = min((block.timestamp for block in blocks), default=None)
+        hashed = [block for block in blocks if block.body.strip()]
+        self.state["files"][path] = {
+            "offset": len(data),
+            # A signature that does not describe exactly these bytes would let a later append go unseen
+            "mtime_ns": stat.st_mtime_ns if stat.st_size == len(data) else None,
+            "size": stat.st_size,
+            "prefix": prefix_digest(data),
+            "oldest": oldest.strftime(TIMESTAMP_FORMAT) if oldest else None,
+            "exact": sorted({exact_hash(block) for block in hashed}),
+            "near": sorted({near_hash(block) for block in hashed}),
+        }
+
+    def _compact_tail(self, path: str, cutoff: datetime, dry_run: bool) -> Optional[int]:
+        """
+        Processes only the bytes appended since the checkpoint.
+
+        Returns:
+            The number of bytes scanned, or None when a full pass is needed
+            (no checkpoint, rewritten prefix, expired entries or a duplicate).
+        """
+        checkpoint = self.state["files"].get(path)
+        if not checkpoint:
+            return None
+        if checkpoint["oldest"] and datetime.strptime(checkpoint["oldest"], TIMESTAMP_FORMAT) < cutoff:
+            return None
+        offset = checkpoint["offset"]
+        stat = os.stat(path)
+        if (stat.st_mtime_ns, stat.st_size) == (checkpoint["mtime_ns"], checkpoint["size"]):
+            return 0
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        record_bytes_read(len(data))
+        if len(data) < offset or prefix_digest(data[:offset]) != checkpoint["prefix"]:
+            return None
+
+        tail = data[offset:]
+        exact, near = set(checkpoint["exact"]), set(checkpoint["near"])
+        oldest = checkpoint["oldest"]
+        for block in split_blocks(tail.decode("utf-8")):
+            if block.timestamp is None:
+                continue
+            if block.timestamp < cutoff:
+                return None
+            stamp = block.timestamp.strftime(TIMESTAMP_FORMAT)
+            oldest = min(oldest, stamp) if oldest else stamp
+            if not block.body.strip():
+                continue
+            block_exact, block_near = exact_hash(block), near_hash(block)
+            if block_exact in exact or block_near in near:
+                return None
+            exact.add(block_exact)
+            near.add(block_near)
+
+        if not dry_run:
+            self.state["files"][path] = {
+                "offset": len(data),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "prefix": prefix_digest(data),
+                "oldest": oldest,
+                "exact": sorted(exact),
+                "near": sorted(near),
+            }
+        return len(tail)
+
+    def compact(self, path: str, max_age_days: int, now: Optional[datetime] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Compacts ``path`` and returns a summary of what changed."""
+        cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+
+        scanned = self._compact_tail(path, cutoff, dry_run)
+        if scanned is not None:
+            return {
+                "incremental": True,
+                "bytes_scanned": scanned,
+                "rewritten": False,
+                "archived": 0,
+                "exact_duplicates_merged": 0,
+                "near_duplicates_merged": 0,
+                "archive_files": [],
+            }
+
+        with open(path, "rb") as f:
+            data = f.read()
+        record_bytes_read(len(data))
+        original = data.decode("utf-8")
+        result = compact_content(original, cutoff)
+        archived = [(block.timestamp, block.text) for block in result.archived]
+        archive_files = {os.path.join(self.archive.archive_dir, self.archive.segment_name(path, timestamp)) for timestamp, _ in archived}
+
+        changed = result.content != original
+        if not dry_run:
+            # Archive before rewriting, so a crash duplicates entries instead of losing them
+            self.archive.append(path, archived)
+            if changed:
+                atomic_write(path, result.content)
+            self._checkpoint(path, result.content.encode("utf-8"), os.stat(path))
+
+        return {
+            "incremental": False,
+            "bytes_scanned": len(data),
+            "rewritten": changed and not dry_run,
+            "archived": len(result.archived),
+            "exact_duplicates_merged": result.exact_merged,
+            "near_duplicates_merged": result.near_merged,
+            "archive_files": sorted(archive_files),
+        }
+
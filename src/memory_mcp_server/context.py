@@ -0,0 +1,128 @@
+"""Token-budgeted session context assembly."""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .sections import Section, parse_sections
+except ImportError:
+    from memory_mcp_server.sections import Section, parse_sections
+
+# Files read at session start, per the mandatory startup sequence
+SESSION_FILES = ("known-issues.md", "working-memory.md", "project-knowledge.md")
+
+# Lower value = packed first
+PRIORITY_CRITICAL_ISSUES = 0
+PRIORITY_CURRENT_CONTEXT = 1
+PRIORITY_RECENT_DECISIONS = 2
+PRIORITY_KNOWLEDGE = 3
+PRIORITY_OTHER = 4
+
+PRIORITY_NAMES = {
+    PRIORITY_CRITICAL_ISSUES: "critical-issues",
+    PRIORITY_CURRENT_CONTEXT: "current-context",
+    PRIORITY_RECENT_DECISIONS: "recent-decisions",
+    PRIORITY_KNOWLEDGE: "project-knowledge",
+    PRIORITY_OTHER: "other",
+}
+
+TOKEN_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+TIMESTAMP_HEADING_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2})?$")
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap BPE-style token estimate: punctuation counts as one token and words
+    as one token per four characters, which tracks common tokenizers closely
+    for English prose and markdown.
+    """
+    return sum((len(piece) + 3) // 4 for piece in TOKEN_PIECE_RE.findall(text))
+
+
+def has_body(section: Section) -> bool:
+    """Returns False for sections that only hold a heading and template comments."""
+    body = section.text.split("\n", 1)[1] if section.heading and "\n" in section.text else section.text
+    return bool(COMMENT_RE.sub("", body).strip(" \t\n-_"))
+
+
+def entry_timestamp(heading: str) -> Optional[float]:
+    """Parses the ``YYYY-MM-DD HH:MM:SS`` heading that memory_update emits."""
+    if not TIMESTAMP_HEADING_RE.match(heading):
+        return None
+    try:
+        return datetime.fromisoformat(heading.replace(" ", "T")).timestamp()
+    except ValueError:
+        return None
+
+
+def classify(file_name: str, section: Section) -> Tuple[int, float]:
+    """Returns the packing priority of a section and its rank within that priority."""
+    top = section.heading_path[0] if section.heading_path else ""
+    lowered = top.lower()
+    if file_name == "known-issues.md" and lowered.startswith("critical"):
+        return PRIORITY_CRITICAL_ISSUES, 0
+    if file_name == "working-memory.md":
+        if lowered.startswith("current context"):
+            return PRIORITY_CURRENT_CONTEXT, 0
+        timestamp = entry_timestamp(top)
+        if timestamp is not None:
+            # Newest timestamped entries first
+            return PRIORITY_RECENT_DECISIONS, -timestamp
+        if "decision" in lowered:
+            return PRIORITY_RECENT_DECISIONS, 0
+    if file_name == "project-knowledge.md":
+        if "decision" in lowered:
+            return PRIORITY_RECENT_DECISIONS, 1
+        return PRIORITY_KNOWLEDGE, 0
+    return PRIORITY_OTHER, 0
+
+
+def build_context(files: List[Tuple[str, str]], token_budget: int) -> Dict[str, Any]:
+    """
+    Packs sections of the given files into ``token_budget`` tokens.
+
+    Sections are taken in priority order (critical issues, current context,
+    recent decisions, remaining knowledge) and first-fit: a section that does
+    not fit is reported as omitted and smaller ones after it are still tried.
+
+    Args:
+        files: (file_name, content) pairs.
+        token_budget: Maximum estimated tokens for the assembled context.
+    """
+    candidates = []
+    for file_order, (file_name, content) in enumerate(files):
+        for section_order, section in enumerate(parse_sections(content)):
+            if not has_body(section):
+                continue
+            priority, rank = classify(file_name, section)
+            candidates.append((priority, rank, file_order, section_order, file_name, section))
+    candidates.sort(key=lambda item: item[:4])
+
+    included = []
+    omitted = []
+    parts = []
+    used = 0
+    for priority, _, _, _, file_name, section in candidates:
+        block = f"<!-- {file_name} > {section.anchor} -->\n{section.text.rstrip()}\n"
+        tokens = estimate_tokens(block)
+        record = {
+            "file_name": file_name,
+            "heading_path": section.heading_path,
+            "priority": PRIORITY_NAMES[priority],
+            "tokens": tokens,
+        }
+        if used + tokens <= token_budget:
+            parts.append(block)
+            included.append(record)
+            used += tokens
+        else:
+            omitted.append(record)
+
+    return {
+        "context": "\n".join(parts),
+        "included": included,
+        "omitted": omitted,
+        "tokens_used": used,
+    }
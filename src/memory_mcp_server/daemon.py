@@ -0,0 +1,132 @@
+"""HTTP daemon mode: one long-lived server shared by several MCP clients."""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_QUEUE = 64
+HEALTH_PATH = "/health"
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+
+class ConcurrencyLimiter:
+    """
+    ASGI middleware bounding how many MCP requests run at once.
+
+    Only POST requests carry MCP messages, so only they take a slot; the
+    long-lived GET streams clients keep open are never queued. Up to
+    ``max_queue`` requests wait for a slot, later ones are rejected with 503
+    and a Retry-After header. ``GET /health`` is answered here, outside the
+    limit, with the limiter counters plus whatever ``health_info`` returns.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        transport: str = "streamable-http",
+        health_info: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        self.app = app
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.transport = transport
+        self.health_info = health_info
+        self.active = 0
+        self.queued = 0
+        self.served = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "GET" and scope["path"] == HEALTH_PATH:
+            await self._send_json(send, 200, self.health())
+            return
+        if scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            await self._send_json(send, 503, {"error": "Server busy, retry later"}, [(b"retry-after", b"1")])
+            return
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+            self.served += 1
+            self._semaphore.release()
+
+    def health(self) -> Dict[str, Any]:
+        status = {
+            "status": "ok",
+            "transport": self.transport,
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "requests": {
+                "active": self.active,
+                "queued": self.queued,
+                "served": self.served,
+                "rejected": self.rejected,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+            },
+        }
+        if self.health_info:
+            try:
+                status.update(self.health_info())
+            except Exception as e:
+                logger.error(f"Health callback failed: {e}")
+        return status
+
+    @staticmethod
+    async def _send_json(send, status: int, body: Dict[str, Any], headers: Optional[list] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode("ascii")),
+                *(headers or []),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+
+def serve(
+    mcp,
+    transport: str,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+    health_info: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> None:
+    """Runs the FastMCP server over HTTP until interrupted."""
+    import uvicorn
+
+    app = mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+    limited = ConcurrencyLimiter(app, max_concurrency, max_queue, transport, health_info)
+    logger.info(
+        f"Serving {transport} on http://{host}:{port} "
+        f"(max {limited.max_concurrency} concurrent requests, queue {limited.max_queue}, health at {HEALTH_PATH})"
+    )
+    uvicorn.run(limited, host=host, port=port, log_level="warning")
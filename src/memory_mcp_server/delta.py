@@ -0,0 +1,64 @@
+"""Version history and deltas for repeat loads of memory files."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_HISTORY_MAX_BYTES = 8 * 1024 * 1024
+
+
+class VersionStore:
+    """
+    Remembers the content of recently served file versions, bounded by
+    ``max_bytes`` with LRU eviction, so later loads can answer with a delta
+    against the version a client already holds.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_HISTORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, version: str, content: str) -> None:
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version in self._contents:
+                self._contents.move_to_end(version)
+                return
+            self._contents[version] = content
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._contents.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def get(self, version: str) -> Optional[str]:
+        with self._lock:
+            content = self._contents.get(version)
+            if content is not None:
+                self._contents.move_to_end(version)
+            return content
+
+
+def compute_delta(old: str, new: str) -> Optional[Dict[str, Any]]:
+    """
+    Describes how to turn ``old`` into ``new``.
+
+    Pure appends, the common case for memory files, are returned as the
+    appended text. Anything else becomes a unified line diff. Returns None
+    when the delta would not be smaller than ``new`` itself.
+    """
+    if new.startswith(old):
+        return {"type": "append", "text": new[len(old):]}
+    import difflib
+    diff = "".join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile="known",
+        tofile="current",
+    ))
+    if len(diff) >= len(new):
+        return None
+    return {"type": "unified_diff", "diff": diff}
@@ -0,0 +1,207 @@
+"""Structured known-issue records and a matcher for error strings."""
+
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from .search import stem
+    from .patterns import STOPWORDS
+except ImportError:
+    from memory_mcp_server.search import stem
+    from memory_mcp_server.patterns import STOPWORDS
+
+ISSUE_HEADING_RE = re.compile(r"^###\s+\[?([^\]\s:]+)\]?\s*:\s*(.+?)\s*$")
+SECTION_HEADING_RE = re.compile(r"^##\s+(.+?)\s*$")
+FIELD_RE = re.compile(r"^\s*(?:[-*]\s+)?\*\*([^*:]+?)(?::\*\*|\*\*\s*:)\s*(.*)$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+KNOWN_FIELDS = ("severity", "component", "description", "workaround", "status", "date")
+
+# Stack-trace frames and other lines that carry location, not meaning
+TRACE_LINE_RE = re.compile(
+    r"^\s*(at\s+\S|File \".*\", line \d+|Traceback \(most recent call last\)|\^+\s*$|\.\.\. \d+ more"
+    r"|#\d+\s+0x|goroutine \d+|\d+:\s+0x|During handling of the above exception)"
+)
+# Volatile tokens inside the remaining lines: addresses, ids, paths, positions, quoted values
+NOISE_RE = re.compile(
+    r"0x[0-9a-fA-F]+|\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b|\b[0-9a-f]{12,40}\b"
+    r"|(?:[A-Za-z]:)?(?:[\w.@-]*[/\\])+[\w.@-]+(?::\d+)*|:\d+(?::\d+)?\b|\b\d+(?:\.\d+)*\b|'[^']*'|\"[^\"]*\"|`[^`]*`"
+)
+ERROR_TYPE_RE = re.compile(r"\b([A-Z][A-Za-z0-9]*(?:Error|Exception|Fault|Failure|Panic))\b|\b(E[A-Z]{3,}|ERR_[A-Z_]+)\b")
+WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[^\W\d_]+", re.UNICODE)
+
+# Relative weight of each part of a record in the match score
+FIELD_WEIGHTS = {"id": 3.0, "title": 3.0, "error_type": 3.0, "component": 2.0, "description": 1.0, "workaround": 0.5, "body": 1.0}
+ERROR_TYPE_BONUS = 0.25
+
+
+@dataclass
+class KnownIssue:
+    """One ``### [ID]: [Title]`` record of known-issues.md."""
+    id: str
+    title: str
+    category: Optional[str]
+    line: int
+    fields: Dict[str, str] = field(default_factory=dict)
+    body: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {"id": self.id, "title": self.title, "category": self.category, "line": self.line}
+        for name in KNOWN_FIELDS:
+            record[name] = self.fields.get(name)
+        if record["description"] is None and self.body:
+            # Records written as free text keep their details in the body
+            record["description"] = self.body
+        extra = {name: value for name, value in self.fields.items() if name not in KNOWN_FIELDS}
+        if extra:
+            record["fields"] = extra
+        return record
+
+
+def parse_known_issues(content: str) -> List[KnownIssue]:
+    """Parses issue records, skipping the template and anything inside code fences."""
+    issues: List[KnownIssue] = []
+    category = None
+    current: Optional[KnownIssue] = None
+    body: List[str] = []
+    in_fence = False
+
+    def close() -> None:
+        if current is not None:
+            current.body = "\n".join(body).strip()
+            issues.append(current)
+
+    for number, line in enumerate(content.splitlines(), start=1):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        if in_fence:
+            if current is not None:
+                body.append(line)
+            continue
+        issue = ISSUE_HEADING_RE.match(line)
+        section = SECTION_HEADING_RE.match(line)
+        if issue or section or line.startswith("# "):
+            close()
+            current, body = None, []
+            if section:
+                category = section.group(1)
+            if issue and not (issue.group(1) == "ID" and issue.group(2) == "[Title]"):
+                current = KnownIssue(id=issue.group(1), title=issue.group(2), category=category, line=number)
+            continue
+        if current is None:
+            continue
+        match = FIELD_RE.match(line)
+        if match:
+            current.fields[match.group(1).strip().lower()] = match.group(2).strip()
+        else:
+            body.append(line)
+    close()
+    return issues
+
+
+def error_signature(text: str) -> str:
+    """Normalizes an error message: drops stack frames and volatile tokens, keeps the words."""
+    lines = [line for line in text.splitlines() if line.strip() and not TRACE_LINE_RE.match(line)]
+    stripped = NOISE_RE.sub(" ", "\n".join(lines))
+    return " ".join(" ".join(WORD_RE.findall(stripped)).split()).lower()
+
+
+def error_types(text: str) -> Set[str]:
+    return {(match.group(1) or match.group(2)).lower() for match in ERROR_TYPE_RE.finditer(text)}
+
+
+def terms(text: str) -> List[str]:
+    words = [word.lower() for word in WORD_RE.findall(NOISE_RE.sub(" ", text))]
+    return [stem(word) for word in words if len(word) > 1 and word not in STOPWORDS]
+
+
+class KnownIssueMatcher:
+    """
+    Weighted TF-IDF matcher over the records of one known-issues.md version.
+
+    Record vectors, IDF weights and error types are computed once when the
+    matcher is built, so matching an error is a sparse dot product per record.
+    """
+
+    def __init__(self, issues: List[KnownIssue]):
+        self.issues = issues
+        self.error_types = [
+            error_types(" ".join([issue.title, issue.fields.get("description", ""), issue.body]))
+            for issue in issues
+        ]
+        raw = [self._weighted_terms(issue, types) for issue, types in zip(issues, self.error_types)]
+        document_frequency: Dict[str, int] = {}
+        for weights in raw:
+            for term in weights:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        self.idf = {term: math.log((len(issues) + 1) / (count + 0.5)) + 1 for term, count in document_frequency.items()}
+        self.vectors = [self._normalize({term: weight * self.idf[term] for term, weight in weights.items()}) for weights in raw]
+
+    @staticmethod
+    def _weighted_terms(issue: KnownIssue, types: Set[str]) -> Dict[str, float]:
+        parts = {
+            "id": issue.id,
+            "title": issue.title,
+            "error_type": " ".join(types),
+            "component": issue.fields.get("component", ""),
+            "description": issue.fields.get("description", ""),
+            "workaround": issue.fields.get("workaround", ""),
+            "body": issue.body,
+        }
+        weights: Dict[str, float] = {}
+        for part, text in parts.items():
+            for term in terms(text):
+                weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[part]
+        return {term: 1 + math.log(weight) if weight >= 1 else weight for term, weight in weights.items()}
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {term: value / norm for term, value in vector.items()} if norm else {}
+
+    def match(self, error_text: str, limit: int = 3, min_score: float = 0.1) -> List[Dict[str, Any]]:
+        """Returns the records most similar to ``error_text``, best first."""
+        signature = error_signature(error_text)
+        query: Dict[str, float] = {}
+        for term in terms(signature):
+            query[term] = query.get(term, 0.0) + 1.0
+        query = self._normalize({term: count * self.idf.get(term, 0.0) for term, count in query.items()})
+        query_types = error_types(error_text)
+
+        scored = []
+        for index, vector in enumerate(self.vectors):
+            score = sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+            shared_types = query_types & self.error_types[index]
+            if shared_types:
+                score += ERROR_TYPE_BONUS
+            if score >= min_score:
+                scored.append((score, index, shared_types))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        results = []
+        for score, index, shared_types in scored[:limit]:
+            record = self.issues[index].to_dict()
+            record["score"] = round(min(score, 1.0), 4)
+            record["matched_error_types"] = sorted(shared_types)
+            results.append(record)
+        return results
+
+
+class KnownIssueCache:
+    """Keeps the matcher of the last parsed known-issues.md version."""
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.matcher: Optional[KnownIssueMatcher] = None
+        self._lock = threading.Lock()
+
+    def get(self, version: str, content: str) -> Tuple[KnownIssueMatcher, bool]:
+        """Returns the matcher for this file version and whether it was reused."""
+        with self._lock:
+            if self.matcher is not None and self.version == version:
+                return self.matcher, True
+            self.matcher = KnownIssueMatcher(parse_known_issues(content))
+            self.version = version
+            return self.matcher, False
@@ -0,0 +1,165 @@
+"""Append-only journal that many processes can write memory entries to at once."""
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .writer import FILES_LOCK_NAME, append_entries, flocked
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.writer import FILES_LOCK_NAME, append_entries, flocked
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = ".memory.journal"
+JOURNAL_LOCK_NAME = ".memory.journal.lock"
+
+RECORD_MAGIC = b"MJ01"
+RECORD_HEADER = struct.Struct("<4sII")
+
+
+def encode_record(file_name: str, entry: str) -> bytes:
+    payload = file_name.encode("utf-8") + b"\0" + entry.encode("utf-8")
+    return RECORD_HEADER.pack(RECORD_MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_records(data: bytes) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    Decodes journal records up to the first torn or corrupt one.
+
+    Returns:
+        A tuple of ((file name, entry) records, bytes consumed).
+    """
+    records = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        magic, length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if magic != RECORD_MAGIC or len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        file_name, _, entry = payload.partition(b"\0")
+        records.append((file_name.decode("utf-8"), entry.decode("utf-8")))
+        offset = start + length
+    return records, offset
+
+
+class AppendJournal:
+    """
+    Append-only journal of memory entries for one memory directory.
+
+    Writers append length-prefixed, CRC-checked records with a single
+    ``O_APPEND`` write under a shared lock, so any number of processes can
+    append at once without queuing behind each other. ``drain`` takes the lock
+    exclusively, appends the records to their markdown files (one write and
+    fsync per file, under the directory's files lock) and truncates the
+    journal. Markdown readers therefore only ever see whole entries. Delivery
+    is at least once: a crash between the markdown fsync and the truncate
+    replays the drained records on the next drain.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self.lock_path = os.path.join(directory, JOURNAL_LOCK_NAME)
+
+    def append(self, file_name: str, entries: List[str]) -> int:
+        """Journals entries for ``file_name`` (a name inside this directory); returns bytes written."""
+        data = b"".join(encode_record(file_name, entry) for entry in entries)
+        with flocked(self.lock_path, exclusive=False):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return len(data)
+
+    def pending(self) -> bool:
+        try:
+            return os.stat(self.path).st_size > 0
+        except FileNotFoundError:
+            return False
+
+    def drain(self, blocking: bool = True) -> Optional[Dict[str, int]]:
+        """
+        Moves journaled entries into their markdown files.
+
+        Returns:
+            Entries written per markdown path, or None if ``blocking`` is False
+            and another process is draining or appending.
+        """
+        with flocked(self.lock_path, blocking=blocking) as acquired:
+            if not acquired:
+                return None
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return {}
+            if not data:
+                return {}
+            record_bytes_read(len(data))
+            records, consumed = decode_records(data)
+            if consumed < len(data):
+                # Appenders hold the shared lock while writing, so this is a crashed write
+                logger.warning(f"Dropping {len(data) - consumed} corrupt bytes at the end of {self.path}")
+
+            grouped: Dict[str, List[str]] = {}
+            for file_name, entry in records:
+                if os.path.basename(file_name) != file_name:
+                    logger.warning(f"Skipping journal record for invalid file name {file_name!r}")
+                    continue
+                grouped.setdefault(os.path.join(self.directory, file_name), []).append(entry)
+            with flocked(os.path.join(self.directory, FILES_LOCK_NAME)):
+                for path, entries in grouped.items():
+                    append_entries(path, entries)
+            with open(self.path, "r+b") as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+            return {path: len(entries) for path, entries in grouped.items()}
+
+
+class JournalSet:
+    """The journals of every memory directory this process has written to."""
+
+    def __init__(self):
+        self.journals: Dict[str, AppendJournal] = {}
+        self._lock = threading.Lock()
+
+    def journal(self, directory: str) -> AppendJournal:
+        with self._lock:
+            journal = self.journals.get(directory)
+            if journal is None:
+                journal = self.journals[directory] = AppendJournal(directory)
+            return journal
+
+    def append(self, path: str, entries: List[str]) -> int:
+        return self.journal(os.path.dirname(path)).append(os.path.basename(path), entries)
+
+    def drain(self, blocking: bool = True) -> Tuple[Dict[str, int], bool]:
+        """
+        Drains every known journal that has records; busy ones are skipped unless ``blocking``.
+
+        Returns:
+            A tuple of (entries written per markdown path, whether a busy journal was skipped).
+        """
+        with self._lock:
+            journals = list(self.journals.values())
+        drained: Dict[str, int] = {}
+        skipped = False
+        for journal in journals:
+            if journal.pending():
+                result = journal.drain(blocking)
+                if result is None:
+                    skipped = True
+                else:
+                    drained.update(result)
+        return drained, skipped
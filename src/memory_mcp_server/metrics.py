@@ -0,0 +1,289 @@
+"""Per-tool latency, filesystem and payload metrics."""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    from .writer import atomic_write
+except ImportError:
+    from memory_mcp_server.writer import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds, Prometheus style (cumulative, plus +Inf)
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Upper bounds in bytes for response sizes
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+RECENT_SAMPLES = 1024
+DEFAULT_EXPORT_INTERVAL = 5.0
+EXPORT_FORMATS = ("prometheus", "jsonl")
+
+
+class Histogram:
+    """Fixed-bucket histogram with sum and count."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[tuple]:
+        """Returns (upper bound, cumulative count) pairs ending with +Inf."""
+        pairs = []
+        running = 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count for bound, count in self.cumulative()},
+            "sum": round(self.total, 3),
+            "count": self.count,
+        }
+
+
+class CallStats:
+    """Counters of one in-flight tool call, fed from the event loop and I/O threads."""
+
+    def __init__(self):
+        self.io_seconds = 0.0
+        self.bytes_read = 0
+        self._lock = threading.Lock()
+
+    def add(self, io_seconds: float = 0.0, bytes_read: int = 0) -> None:
+        with self._lock:
+            self.io_seconds += io_seconds
+            self.bytes_read += bytes_read
+
+    def run(self, func: Callable, *args):
+        """Runs a blocking function on behalf of this call, timing it as filesystem work."""
+        token = _current_call.set(self)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.add(io_seconds=time.perf_counter() - start)
+            _current_call.reset(token)
+
+
+_current_call: "contextvars.ContextVar[Optional[CallStats]]" = contextvars.ContextVar("memory_tool_call", default=None)
+
+
+def current_call() -> Optional[CallStats]:
+    return _current_call.get()
+
+
+def record_bytes_read(count: int) -> None:
+    """Attributes bytes read from memory files to the tool call in progress, if any."""
+    call = _current_call.get()
+    if call is not None:
+        call.add(bytes_read=count)
+
+
+class ToolMetrics:
+    """Aggregated metrics of one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_returned = 0
+        self.wall_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.io_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.response_bytes = Histogram(PAYLOAD_BUCKETS)
+        self.recent_wall_ms: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_wall_ms)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(fraction * len(recent)))], 3)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "wall_ms": {
+                "mean": round(self.wall_ms.total / self.wall_ms.count, 3) if self.wall_ms.count else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(recent[-1], 3) if recent else None,
+            },
+            "io_ms_total": round(self.io_ms.total, 3),
+            "bytes_read": self.bytes_read,
+            "bytes_returned": self.bytes_returned,
+            "histograms": {
+                "wall_ms": self.wall_ms.to_dict(),
+                "io_ms": self.io_ms.to_dict(),
+                "response_bytes": self.response_bytes.to_dict(),
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Records wall time, filesystem time, bytes read and bytes returned per tool.
+
+    Filesystem time is the time spent in blocking functions run through
+    ``CallStats.run`` (summed across threads, so concurrent reads can exceed
+    wall time). With ``export_path`` set, every call is appended there as a
+    JSON line (``jsonl``), or a Prometheus text snapshot is rewritten at most
+    every ``export_interval`` seconds (``prometheus``) for a textfile collector.
+    Exports run on ``executor`` so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        export_path: Optional[str] = None,
+        export_format: str = "prometheus",
+        export_interval: float = DEFAULT_EXPORT_INTERVAL,
+        executor=None,
+    ):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Metrics format must be one of: {', '.join(EXPORT_FORMATS)}")
+        self.export_path = export_path
+        self.export_format = export_format
+        self.export_interval = export_interval
+        self.executor = executor
+        self.started = time.time()
+        self.tools: Dict[str, ToolMetrics] = {}
+        self._last_export = 0.0
+        self._lock = threading.Lock()
+
+    def instrument(self, func: Callable) -> Callable:
+        """Wraps an async tool function; nested tool calls are attributed to the outer call."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_call.get() is not None:
+                return await func(*args, **kwargs)
+            call = CallStats()
+            token = _current_call.set(call)
+            start = time.perf_counter()
+            result = None
+            failed = True
+            try:
+                result = await func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _current_call.reset(token)
+                self.record(name, time.perf_counter() - start, call, result, failed)
+
+        return wrapper
+
+    def record(self, name: str, seconds: float, call: CallStats, result: Any, failed: bool) -> None:
+        returned = len(json.dumps(result, default=str)) if result is not None else 0
+        wall_ms, io_ms = seconds * 1000, call.io_seconds * 1000
+        with self._lock:
+            tool = self.tools.setdefault(name, ToolMetrics())
+            tool.calls += 1
+            tool.errors += int(failed)
+            tool.bytes_read += call.bytes_read
+            tool.bytes_returned += returned
+            tool.wall_ms.observe(wall_ms)
+            tool.io_ms.observe(io_ms)
+            tool.response_bytes.observe(returned)
+            tool.recent_wall_ms.append(wall_ms)
+        if self.export_path:
+            event = {
+                "timestamp": round(time.time(), 3),
+                "tool": name,
+                "wall_ms": round(wall_ms, 3),
+                "io_ms": round(io_ms, 3),
+                "bytes_read": call.bytes_read,
+                "bytes_returned": returned,
+                "error": failed,
+            }
+            self._export(event)
+
+    def _export(self, event: Dict[str, Any]) -> None:
+        if self.export_format == "prometheus":
+            now = time.monotonic()
+            if now - self._last_export < self.export_interval:
+                return
+            self._last_export = now
+            job = self.write_prometheus
+        else:
+            job = functools.partial(self._append_event, event)
+        if self.executor is not None:
+            self.executor.submit(job)
+        else:
+            job()
+
+    def _append_event(self, event: Dict[str, Any]) -> None:
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not append metrics to {self.export_path}: {e}")
+
+    def write_prometheus(self) -> None:
+        try:
+            directory = os.path.dirname(self.export_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            atomic_write(self.export_path, self.prometheus())
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {self.export_path}: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "tools": {name: tool.summary() for name, tool in sorted(self.tools.items())},
+            }
+
+    def prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP memory_mcp_tool_calls_total Tool calls.",
+            "# TYPE memory_mcp_tool_calls_total counter",
+        ]
+        with self._lock:
+            tools = sorted(self.tools.items())
+            for name, tool in tools:
+                lines.append(f'memory_mcp_tool_calls_total{{tool="{name}"}} {tool.calls}')
+            lines += ["# HELP memory_mcp_tool_errors_total Tool calls that raised.", "# TYPE memory_mcp_tool_errors_total counter"]
+            for name, tool in tools:
+                lines.append(f'memory_mcp_tool_errors_total{{tool="{name}"}} {tool.errors}')
+            lines += ["# HELP memory_mcp_tool_read_bytes_total Bytes read from memory files.", "# TYPE memory_mcp_tool_read_bytes_total counter"]
+            for name, tool in tools:
+                lines.append(f'memory_mcp_tool_read_bytes_total{{tool="{name}"}} {tool.bytes_read}')
+            for metric, attribute, help_text in (
+                ("memory_mcp_tool_duration_milliseconds", "wall_ms", "Tool wall time."),
+                ("memory_mcp_tool_io_milliseconds", "io_ms", "Time spent in blocking filesystem work."),
+                ("memory_mcp_tool_response_bytes", "response_bytes", "Serialized response size."),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, tool in tools:
+                    histogram = getattr(tool, attribute)
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f'{metric}_bucket{{tool="{name}",le="{le}"}} {count}')
+                    lines.append(f'{metric}_sum{{tool="{name}"}} {histogram.total:.3f}')
+                    lines.append(f'{metric}_count{{tool="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
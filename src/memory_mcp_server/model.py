@@ -0,0 +1,482 @@
+"""Typed, persisted parse tree of memory files."""
+
+import hashlib
+import logging
+import marshal
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .issues import ISSUE_HEADING_RE, FIELD_RE
+    from .writer import atomic_write
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.issues import ISSUE_HEADING_RE, FIELD_RE
+    from memory_mcp_server.writer import atomic_write
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.*?)[ \t]*#*[ \t]*\r?$")
+FENCE_RE = re.compile(rb"^[ \t]*(```|~~~)")
+ENTRY_HEADING_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})$")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+NODE_KINDS = ("section", "issue", "entry")
+
+
+class Section:
+    """
+    A heading and everything up to the next heading of the same or a higher level.
+
+    Offsets are byte positions in the file: ``start_byte`` is the start of the
+    heading line, ``body_byte`` the first byte after it and ``end_byte`` the
+    end of the last nested section.
+    """
+
+    __slots__ = ("heading", "level", "line", "start_byte", "body_byte", "end_byte", "children")
+    kind = "section"
+
+    def __init__(self, heading: str, level: int, line: int, start_byte: int, body_byte: int, end_byte: int = 0):
+        self.heading = heading
+        self.level = level
+        self.line = line
+        self.start_byte = start_byte
+        self.body_byte = body_byte
+        self.end_byte = end_byte
+        self.children: List["Section"] = []
+
+    def extra(self) -> Tuple:
+        return ()
+
+    def describe(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "heading": self.heading, "level": self.level, "line": self.line}
+
+
+class Issue(Section):
+    """A ``### [ID]: Title`` record of known-issues.md with its ``**Field**:`` values."""
+
+    __slots__ = ("id", "title", "fields")
+    kind = "issue"
+
+    def extra(self) -> Tuple:
+        return (self.id, self.title, self.fields)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "id": self.id, "title": self.title, **self.fields}
+
+
+class Entry(Section):
+    """A ``## YYYY-MM-DD HH:MM:SS`` entry appended by memory_update."""
+
+    __slots__ = ("timestamp",)
+    kind = "entry"
+
+    def extra(self) -> Tuple:
+        return (self.timestamp,)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "timestamp": self.timestamp}
+
+
+NODE_CLASSES = (Section, Issue, Entry)
+
+
+def pack_nodes(sections: List[Section]) -> Tuple:
+    """
+    Flattens a tree into parallel columns in pre-order, one entry per node.
+
+    Columns of plain ints and strings load faster than nested per-node
+    tuples, which matters for files with tens of thousands of headings.
+    """
+    kinds, levels, lines, starts, bodies, ends, parents, headings, extras = [], [], [], [], [], [], [], [], []
+    stack = [(-1, node) for node in reversed(sections)]
+    while stack:
+        parent, node = stack.pop()
+        index = len(kinds)
+        kinds.append(NODE_KINDS.index(node.kind))
+        levels.append(node.level)
+        lines.append(node.line)
+        starts.append(node.start_byte)
+        bodies.append(node.body_byte)
+        ends.append(node.end_byte)
+        parents.append(parent)
+        headings.append(node.heading)
+        extras.append(node.extra())
+        stack.extend((index, child) for child in reversed(node.children))
+    return (kinds, levels, lines, starts, bodies, ends, parents, headings, extras)
+
+
+def unpack_nodes(columns: Tuple) -> List[Section]:
+    """Rebuilds the tree flattened by ``pack_nodes``."""
+    kinds, levels, lines, starts, bodies, ends, parents, headings, extras = columns
+    nodes: List[Section] = []
+    sections: List[Section] = []
+    for index, kind in enumerate(kinds):
+        node = NODE_CLASSES[kind](headings[index], levels[index], lines[index], starts[index], bodies[index], ends[index])
+        if kind == 1:
+            node.id, node.title, node.fields = extras[index]
+        elif kind == 2:
+            node.timestamp = extras[index][0]
+        parent = parents[index]
+        (nodes[parent].children if parent >= 0 else sections).append(node)
+        nodes.append(node)
+    return sections
+
+
+class MemoryDocument:
+    """Parse tree of one memory file, valid for the stat signature and version it was built from."""
+
+    __slots__ = ("path", "mtime_ns", "size", "version", "title", "sections")
+
+    def __init__(self, path: str, mtime_ns: int, size: int, version: str, title: str, sections: List[Section]):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.version = version
+        self.title = title
+        self.sections = sections
+
+    def walk(self) -> Iterator[Tuple[List[str], Section]]:
+        """Yields (heading path, node) for every node, depth first in file order."""
+        stack = [([], node) for node in reversed(self.sections)]
+        while stack:
+            parents, node = stack.pop()
+            path = parents + [node.heading]
+            yield path, node
+            stack.extend((path, child) for child in reversed(node.children))
+
+    def locate(self, heading_path: List[str]) -> Optional[Tuple[List[str], Section]]:
+        """
+        Returns the full path and node of the first node whose heading path
+        ends with ``heading_path``.
+
+        Headings compare case-insensitively and ignore leading ``#`` markers,
+        so ``["## Recent Errors & Solutions"]`` finds that section at any depth.
+        """
+        wanted = [normalize_heading(heading) for heading in heading_path]
+        if not wanted:
+            return None
+        for path, node in self.walk():
+            if [normalize_heading(heading) for heading in path[-len(wanted):]] == wanted:
+                return path, node
+        return None
+
+    def find(self, heading_path: List[str]) -> Optional[Section]:
+        located = self.locate(heading_path)
+        return located[1] if located else None
+
+
+def normalize_heading(heading: str) -> str:
+    return " ".join(heading.lstrip("#").split()).lower()
+
+
+def split_heading_path(heading_path: str) -> List[str]:
+    """Splits ``"Parent > Child"`` (the anchor format used in search results) into headings."""
+    return [part.strip() for part in heading_path.split(">") if part.strip()]
+
+
+def make_node(heading: str, level: int, line: int, start_byte: int, body_byte: int) -> Section:
+    issue = ISSUE_HEADING_RE.match(f"### {heading}") if level == 3 else None
+    if issue and not (issue.group(1) == "ID" and issue.group(2) == "[Title]"):
+        node = Issue(heading, level, line, start_byte, body_byte)
+        node.id, node.title, node.fields = issue.group(1), issue.group(2), {}
+        return node
+    entry = ENTRY_HEADING_RE.match(heading) if level == 2 else None
+    if entry:
+        node = Entry(heading, level, line, start_byte, body_byte)
+        node.timestamp = entry.group(1)
+        return node
+    return Section(heading, level, line, start_byte, body_byte)
+
+
+def parse_document(path: str, data: bytes, mtime_ns: int, size: int, version: str) -> MemoryDocument:
+    """
+    Builds the parse tree of a memory file from its raw bytes.
+
+    Every heading outside fenced code blocks becomes a node nested under the
+    closest preceding heading of a lower level. A leading ``#`` title is kept
+    as the document title rather than as a node; later ``#`` headings inside a
+    timestamped entry stay inside it. Issue records also get their
+    ``**Field**: value`` lines parsed.
+    """
+    title = ""
+    sections: List[Section] = []
+    stack: List[Section] = []
+    ranks: List[int] = []
+    offset = 0
+    in_fence = False
+
+    for line_no, line in enumerate(data.splitlines(keepends=True), start=1):
+        start, offset = offset, offset + len(line)
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADING_RE.match(line.rstrip(b"\n"))
+        if not match:
+            if stack and stack[-1].kind == "issue":
+                field = FIELD_RE.match(line.decode("utf-8", errors="replace"))
+                if field:
+                    stack[-1].fields[field.group(1).strip().lower()] = field.group(2).strip()
+            continue
+        level = len(match.group(1))
+        heading = match.group(2).decode("utf-8", errors="replace")
+        if level == 1 and not title and not sections and not stack:
+            title = heading
+            continue
+        # Entries run to the next "## " heading, so a "# Title" pasted into one nests under it
+        rank = 3 if level == 1 and any(node.kind == "entry" for node in stack) else level
+        while stack and ranks[-1] >= rank:
+            stack.pop().end_byte = start
+            ranks.pop()
+        node = make_node(heading, level, line_no, start, offset)
+        (stack[-1].children if stack else sections).append(node)
+        stack.append(node)
+        ranks.append(rank)
+
+    for node in stack:
+        node.end_byte = offset
+    return MemoryDocument(path, mtime_ns, size, version, title, sections)
+
+
+def content_hash(data: bytes) -> str:
+    # Same token as cache.content_version, computed on the raw bytes
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+class ModelStore:
+    """
+    Parse trees of a workspace's memory files, persisted as marshal sidecars.
+
+    Each file has a sidecar under ``cache_dir`` named after the hash of its
+    path, holding the tree plus the stat signature and content hash it was
+    built from. A tree is reused without reading the file while the stat
+    signature matches, and without re-parsing while the content hash does
+    (e.g. after a touch or a checkout that restored the same bytes).
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.documents: Dict[str, MemoryDocument] = {}
+        self.parsed = 0
+        self.loaded = 0
+        self._lock = threading.Lock()
+
+    def sidecar_path(self, path: str) -> str:
+        digest = hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=10).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.marshal")
+
+    def _read_sidecar(self, path: str) -> Optional[MemoryDocument]:
+        try:
+            with open(self.sidecar_path(path), "rb") as f:
+                data = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable model sidecar for {path}: {e}")
+            return None
+        if not isinstance(data, tuple) or len(data) != 7 or data[0] != MODEL_VERSION or data[1] != path:
+            return None
+        _, _, mtime_ns, size, version, title, sections = data
+        try:
+            return MemoryDocument(path, mtime_ns, size, version, title, unpack_nodes(sections))
+        except (ValueError, TypeError, IndexError) as e:
+            logger.warning(f"Ignoring malformed model sidecar for {path}: {e}")
+            return None
+
+    def _write_sidecar(self, document: MemoryDocument) -> None:
+        data = (
+            MODEL_VERSION, document.path, document.mtime_ns, document.size,
+            document.version, document.title, pack_nodes(document.sections),
+        )
+        try:
+            atomic_write(self.sidecar_path(document.path), marshal.dumps(data))
+        except OSError as e:
+            logger.warning(f"Could not write model sidecar for {document.path}: {e}")
+
+    def document(self, path: str) -> Tuple[MemoryDocument, str]:
+        """
+        Returns the parse tree of ``path`` and where it came from:
+        ``memory``, ``sidecar`` or ``parsed``.
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read.
+        """
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            document = self.documents.get(path)
+        if document and (document.mtime_ns, document.size) == signature:
+            return document, "memory"
+
+        stored = document or self._read_sidecar(path)
+        if stored and (stored.mtime_ns, stored.size) == signature:
+            source = "sidecar"
+            document = stored
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+            record_bytes_read(len(data))
+            version = content_hash(data)
+            if stored and stored.version == version and stored.size == len(data):
+                stored.mtime_ns, stored.size = stat.st_mtime_ns, len(data)
+                document, source = stored, "sidecar"
+            else:
+                document = parse_document(path, data, stat.st_mtime_ns, len(data), version)
+                source = "parsed"
+            self._write_sidecar(document)
+
+        with self._lock:
+            self.documents[path] = document
+            if source == "parsed":
+                self.parsed += 1
+            else:
+                self.loaded += 1
+        return document, source
+
+    def forget(self, path: str) -> None:
+        with self._lock:
+            self.documents.pop(path, None)
+
+
+def entry_after(node: Section, since: Optional[datetime]) -> bool:
+    if since is None:
+        return True
+    try:
+        return datetime.strptime(node.timestamp, TIMESTAMP_FORMAT) >= since
+    except ValueError:
+        return False
+
+
+def field_matches(value: Optional[str], wanted: Optional[str]) -> bool:
+    """Case-insensitive prefix match, so "open" matches "Open" and "Open (tracked in #12)"."""
+    if wanted is None:
+        return True
+    return value is not None and value.strip().lower().startswith(wanted.strip().lower())
+
+
+def query_document(
+    document: MemoryDocument,
+    kind: Optional[str] = None,
+    under: Optional[List[str]] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    component: Optional[str] = None,
+    since: Optional[datetime] = None,
+    text: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the nodes of ``document`` matching every given filter.
+
+    ``under`` keeps nodes nested below the section with that heading path;
+    ``severity``, ``status`` and ``component`` filter issue fields; ``since``
+    filters entries by timestamp; ``text`` matches headings case-insensitively.
+    """
+    root = document.find(under) if under else None
+    if under and root is None:
+        return []
+    wanted = [normalize_heading(heading) for heading in under] if under else []
+    needle = text.lower() if text else None
+
+    results = []
+    for path, node in document.walk():
+        if root is not None and not _below(path, wanted):
+            continue
+        if kind and node.kind != kind:
+            continue
+        if (severity or status or component) and not (
+            node.kind == "issue"
+            and field_matches(node.fields.get("severity"), severity)
+            and field_matches(node.fields.get("status"), status)
+            and field_matches(node.fields.get("component"), component)
+        ):
+            continue
+        if since is not None and not (node.kind == "entry" and entry_after(node, since)):
+            continue
+        if needle and needle not in node.heading.lower():
+            continue
+        result = node.describe()
+        result.update({
+            "heading_path": path,
+            "start_byte": node.start_byte,
+            "end_byte": node.end_byte,
+            "subsections": len(node.children),
+        })
+        results.append(result)
+    return results
+
+
+def _below(path: List[str], wanted: List[str]) -> bool:
+    """Whether a node path lies strictly below a section whose path ends with ``wanted``."""
+    normalized = [normalize_heading(heading) for heading in path[:-1]]
+    for end in range(len(wanted), len(normalized) + 1):
+        if normalized[end - len(wanted):end] == wanted:
+            return True
+    return False
+
+
+UPSERT_MODES = ("append", "replace")
+LIST_ITEM_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s")
+
+
+def plan_upsert(
+    document: MemoryDocument,
+    heading_path: List[str],
+    content: str,
+    mode: str,
+    read: Callable[[int, int], str],
+) -> Tuple[int, int, str, bool]:
+    """
+    Works out the edit that upserts ``content`` into a section.
+
+    ``replace`` swaps the section body (everything after its heading line,
+    nested sections included); ``append`` adds to the section's own text,
+    ahead of its subsections, keeping list items in the same list. Missing
+    headings of the path are created at the end of their deepest existing
+    ancestor, or else at the end of the file. Only the body of the edited
+    section is read, through ``read(start, end)``.
+
+    Returns:
+        A tuple of (start byte, end byte, replacement text, created).
+    """
+    content = content.strip("\n")
+    located = document.locate(heading_path)
+    if located is None:
+        # Create the missing tail of the path under its deepest existing ancestor
+        parent, depth = None, len(heading_path) - 1
+        while depth > 0:
+            parent = document.find(heading_path[:depth])
+            if parent:
+                break
+            depth -= 1
+        level = parent.level if parent else 1
+        position = parent.end_byte if parent else document.size
+        before = read(max(0, position - 2), position) if position else ""
+        separator = "\n" * (2 - (len(before) - len(before.rstrip("\n")))) if position else ""
+        lines = []
+        for heading in heading_path[depth:]:
+            level = min(level + 1, 6)
+            lines.append(f"{'#' * level} {heading.lstrip('#').strip()}\n")
+        trailer = "\n\n" if position < document.size else "\n"
+        return position, position, separator + "\n".join(lines) + content + trailer, True
+
+    _, node = located
+    if mode == "replace":
+        trailer = "\n\n" if node.end_byte < document.size else "\n"
+        return node.body_byte, node.end_byte, f"{content}{trailer}", False
+
+    # Appended text goes after the section's own text, ahead of any subsections
+    body_end = node.children[0].start_byte if node.children else node.end_byte
+    trailer = "\n\n" if body_end < document.size else "\n"
+    body = read(node.body_byte, body_end).rstrip()
+    if not body:
+        return node.body_byte, body_end, f"{content}{trailer}", False
+    last_line = body.rsplit("\n", 1)[-1]
+    first_line = content.split("\n", 1)[0]
+    joiner = "\n" if LIST_ITEM_RE.match(last_line) and LIST_ITEM_RE.match(first_line) else "\n\n"
+    return node.body_byte, body_end, f"{body}{joiner}{content}{trailer}", False
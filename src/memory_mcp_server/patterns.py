@@ -0,0 +1,167 @@
+"""Shingle frequency tracking for promoting recurring working-memory patterns."""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    from .compaction import TIMESTAMP_FORMAT, split_blocks
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.compaction import TIMESTAMP_FORMAT, split_blocks
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+MAX_SHINGLES_PER_ENTRY = 256
+EXCERPT_CHARS = 160
+
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was were will with "
+    "o a os as de do da dos das e em um uma para com por que no na nos nas se".split()
+)
+
+
+def shingles(text: str) -> Set[str]:
+    """Returns the distinct word n-grams of an entry, skipping stopword-only ones."""
+    words = [word for word in WORD_RE.findall(text.lower()) if len(word) > 1]
+    result: Set[str] = set()
+    for start in range(len(words) - SHINGLE_SIZE + 1):
+        gram = words[start:start + SHINGLE_SIZE]
+        if all(word in STOPWORDS for word in gram):
+            continue
+        result.add(" ".join(gram))
+        if len(result) >= MAX_SHINGLES_PER_ENTRY:
+            break
+    return result
+
+
+class PatternTracker:
+    """
+    Counts in how many working-memory entries each shingle occurs.
+
+    Every tracked entry is appended as one JSON line to ``log_path``, so
+    recording an entry costs O(entry size) both in memory and on disk; the
+    table is rebuilt from the log once per process. Counts reflect every entry
+    ever written, including ones later archived by compaction.
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.entries: List[Dict[str, Any]] = []
+        self.table: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        for gram in entry["shingles"]:
+            self.table.setdefault(gram, []).append(entry_id)
+
+    def load(self, seed_paths: List[str]) -> None:
+        """Rebuilds the table from the log, seeding it from ``seed_paths`` if no log exists yet."""
+        with self._lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            if not os.path.exists(self.log_path):
+                self._seed(seed_paths)
+                return
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._index(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipping corrupt line in {self.log_path}")
+
+    def _seed(self, paths: List[str]) -> None:
+        records = []
+        for path in paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                record_bytes_read(len(content))
+            except (OSError, UnicodeDecodeError):
+                continue
+            for block in split_blocks(content):
+                if block.timestamp:
+                    records.append(self._record(os.path.basename(path), block.body, block.timestamp.strftime(TIMESTAMP_FORMAT)))
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            for record in records:
+                self._index(record)
+                f.write(json.dumps(record) + "\n")
+
+    @staticmethod
+    def _record(file_name: str, content: str, timestamp: Optional[str]) -> Dict[str, Any]:
+        return {
+            "file": file_name,
+            "timestamp": timestamp,
+            "excerpt": " ".join(content.split())[:EXCERPT_CHARS],
+            "shingles": sorted(shingles(content)),
+        }
+
+    def add_entry(self, file_name: str, content: str, timestamp: Optional[str]) -> None:
+        """Records one new entry, touching only its own shingles."""
+        record = self._record(file_name, content, timestamp)
+        if not record["shingles"]:
+            return
+        with self._lock:
+            self._index(record)
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def candidates(self, threshold: int = 3, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns patterns seen in at least ``threshold`` entries, most frequent first.
+
+        Shingles that occur in exactly the same set of entries are reported
+        once, as the phrase formed by chaining their overlapping words.
+        """
+        with self._lock:
+            groups: Dict[tuple, List[str]] = {}
+            for gram, entry_ids in self.table.items():
+                if len(entry_ids) >= threshold:
+                    groups.setdefault(tuple(entry_ids), []).append(gram)
+
+            results = []
+            for entry_ids, grams in groups.items():
+                results.append({
+                    "pattern": chain_shingles(grams),
+                    "occurrences": len(entry_ids),
+                    "shingles": len(grams),
+                    "entries": [
+                        {key: self.entries[entry_id][key] for key in ("file", "timestamp", "excerpt")}
+                        for entry_id in entry_ids[-3:]
+                    ],
+                })
+        results.sort(key=lambda item: (item["occurrences"], item["shingles"]), reverse=True)
+        return results[:limit]
+
+
+def chain_shingles(grams: List[str]) -> str:
+    """Joins overlapping n-grams into the longest phrase they spell out."""
+    by_prefix = {tuple(gram.split()[:-1]): gram for gram in grams}
+    suffixes = {tuple(gram.split()[1:]) for gram in grams}
+    starts = [gram for gram in grams if tuple(gram.split()[:-1]) not in suffixes] or sorted(grams)[:1]
+    best = ""
+    for start in starts:
+        words = start.split()
+        seen = {start}
+        while True:
+            following = by_prefix.get(tuple(words[-(SHINGLE_SIZE - 1):]))
+            if following is None or following in seen:
+                break
+            seen.add(following)
+            words.append(following.split()[-1])
+        phrase = " ".join(words)
+        if len(phrase) > len(best):
+            best = phrase
+    return best
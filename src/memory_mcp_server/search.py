@@ -0,0 +1,250 @@
+"""Persistent BM25 inverted index over memory file sections."""
+
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .sections import parse_sections
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.sections import parse_sections
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STEM_SUFFIXES = ("ations", "ation", "ions", "ion", "ings", "ing", "ers", "er", "ed", "es", "s")
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Files at least this large are memory-mapped for range reads
+MMAP_MIN_BYTES = 1024 * 1024
+
+# Rank offset used when fusing keyword and semantic results
+RRF_K = 60
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so "validation", "validated" and "validate" share a feature."""
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)].rstrip("e")
+    return word.rstrip("e") if len(word) > 4 else word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into word tokens."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 or token.isdigit()]
+
+
+class SearchIndex:
+    """
+    Section-level inverted index for one memory workspace.
+
+    Per-file entries (stat signature plus term frequencies of each section) are
+    persisted as JSON under ``index_path``. On every ``refresh`` only files whose
+    ``(st_mtime_ns, st_size)`` changed are re-parsed; postings for untouched
+    files are kept as they are.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[Tuple[str, int], int]] = {}
+        self.total_length = 0
+        self.doc_count = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable search index {self.index_path}: {e}")
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        for path, entry in data.get("files", {}).items():
+            self._add_file(path, entry)
+
+    def save(self) -> None:
+        """Writes the index to disk atomically if it changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "files": self.files}, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    def _add_file(self, path: str, entry: Dict[str, Any]) -> None:
+        self.files[path] = entry
+        for idx, section in enumerate(entry["sections"]):
+            for term, tf in section["tf"].items():
+                self.postings.setdefault(term, {})[(path, idx)] = tf
+            self.total_length += section["length"]
+            self.doc_count += 1
+
+    def _remove_file(self, path: str) -> None:
+        entry = self.files.pop(path, None)
+        if entry is None:
+            return
+        for idx, section in enumerate(entry["sections"]):
+            for term in section["tf"]:
+                docs = self.postings.get(term)
+                if docs is not None:
+                    docs.pop((path, idx), None)
+                    if not docs:
+                        del self.postings[term]
+            self.total_length -= section["length"]
+            self.doc_count -= 1
+
+    def index_content(self, path: str, content: str, mtime_ns: int, size: int) -> None:
+        """Replaces the index entry for ``path`` with sections parsed from ``content``."""
+        sections = []
+        for section in parse_sections(content):
+            tokens = tokenize(section.text)
+            sections.append({
+                "heading": section.heading,
+                "heading_path": section.heading_path,
+                "start_line": section.start_line,
+                "start_byte": section.start_byte,
+                "end_byte": section.end_byte,
+                "length": len(tokens),
+                "tf": dict(Counter(tokens)),
+            })
+        with self._lock:
+            self._remove_file(path)
+            self._add_file(path, {"mtime_ns": mtime_ns, "size": size, "sections": sections})
+            self._dirty = True
+
+    def refresh(self, paths: List[str], signatures: Optional[Dict[str, Tuple[int, int]]] = None) -> int:
+        """
+        Brings the index in line with ``paths``.
+
+        ``signatures`` maps paths to known ``(st_mtime_ns, st_size)`` pairs,
+        e.g. from a filesystem watcher, and saves a stat call per file.
+
+        Returns:
+            The number of files that were (re)indexed or dropped.
+        """
+        changed = 0
+        wanted = set(paths)
+        with self._lock:
+            for path in list(self.files):
+                if path not in wanted:
+                    self._remove_file(path)
+                    self._dirty = True
+                    changed += 1
+
+        for path in paths:
+            signature = (signatures or {}).get(path)
+            if signature is None:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self.files.get(path)
+            if entry and entry["mtime_ns"] == signature[0] and entry["size"] == signature[1]:
+                continue
+            try:
+                # Binary read: section offsets must be byte offsets into the file as read_range sees it
+                with open(path, "rb") as f:
+                    data = f.read()
+                record_bytes_read(len(data))
+                content = data.decode("utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping {path} while indexing: {e}")
+                continue
+            self.index_content(path, content, signature[0], signature[1])
+            changed += 1
+        return changed
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Scores sections against ``query`` with BM25 and returns the top ``limit`` hits."""
+        terms = set(tokenize(query))
+        with self._lock:
+            ranked = self._rank(terms, limit)
+        results = []
+        for (path, idx), score, section in ranked:
+            results.append({
+                "path": path,
+                "file_name": os.path.basename(path),
+                "heading": section["heading"],
+                "heading_path": section["heading_path"],
+                "line": section["start_line"],
+                "score": round(score, 4),
+                "content": read_range(path, section["start_byte"], section["end_byte"]),
+            })
+        return results
+
+    def _rank(self, terms: set, limit: int) -> List[Tuple[Tuple[str, int], float, Dict[str, Any]]]:
+        if not terms or not self.doc_count:
+            return []
+
+        avg_length = self.total_length / self.doc_count
+        scores: Dict[Tuple[str, int], float] = {}
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, tf in docs.items():
+                length = self.files[doc[0]]["sections"][doc[1]]["length"]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(doc, score, self.files[doc[0]]["sections"][doc[1]]) for doc, score in ranked]
+
+
+def read_range(path: str, start: int, end: int) -> str:
+    """
+    Reads the UTF-8 text between two byte offsets of a file.
+
+    Ranges of large files are sliced from a read-only memory map, so only the
+    pages backing the range are faulted in.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = min(end, size)
+        if start >= end:
+            data = b""
+        elif size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                data = mapped[start:end]
+        else:
+            f.seek(start)
+            data = f.read(end - start)
+    record_bytes_read(len(data))
+    return data.decode("utf-8", errors="replace")
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """Merges ranked result lists by summing 1 / (RRF_K + rank) per section."""
+    fused: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    scores: Dict[Tuple[str, int], float] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results):
+            key = (result["path"], result["line"])
+            fused.setdefault(key, result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [dict(fused[key], score=round(scores[key], 4)) for key in ranked]
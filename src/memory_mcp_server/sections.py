@@ -0,0 +1,120 @@
+"""Markdown section parsing for memory files."""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+try:
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.metrics import record_bytes_read
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+# Headings at these levels start a new section; deeper ones stay inside it.
+SECTION_LEVELS = (2, 3)
+
+
+@dataclass
+class Section:
+    """A heading-delimited slice of a memory file."""
+    heading: str
+    level: int
+    heading_path: List[str] = field(default_factory=list)
+    start_line: int = 1
+    start_byte: int = 0
+    end_byte: int = 0
+    text: str = ""
+
+    @property
+    def anchor(self) -> str:
+        return " > ".join(self.heading_path) if self.heading_path else self.heading
+
+
+def parse_sections(content: str) -> List[Section]:
+    """
+    Splits markdown content into sections on ``##`` and ``###`` headings.
+
+    Text before the first section heading (usually the ``#`` title and intro)
+    becomes a level-1 section named after the title. Headings inside fenced
+    code blocks are ignored. Byte offsets are relative to the UTF-8 encoding
+    of ``content``.
+    """
+    sections: List[Section] = []
+    parents: List[str] = []
+    current = Section(heading="", level=1)
+    buffer: List[str] = []
+    offset = 0
+    in_fence = False
+
+    def close(end: int) -> None:
+        current.end_byte = end
+        current.text = "".join(buffer)
+        if current.text.strip():
+            sections.append(current)
+
+    for line_no, line in enumerate(content.splitlines(keepends=True), start=1):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            level = len(match.group(1))
+            title = match.group(2)
+            if level == 1 and not current.heading and not sections:
+                current.heading = title
+                current.heading_path = [title]
+            elif level in SECTION_LEVELS:
+                close(offset)
+                if level == 2:
+                    parents = [title]
+                else:
+                    parents = parents[:1] + [title]
+                current = Section(
+                    heading=title,
+                    level=level,
+                    heading_path=list(parents),
+                    start_line=line_no,
+                    start_byte=offset,
+                )
+                buffer = []
+        buffer.append(line)
+        offset += len(line.encode("utf-8"))
+
+    close(offset)
+    return sections
+
+
+def read_chunk(path: str, offset: int, max_bytes: int) -> Tuple[str, int, int]:
+    """
+    Reads at most ``max_bytes`` of ``path`` starting at byte ``offset``.
+
+    Unless the chunk reaches the end of the file, it is cut before the last
+    heading in its second half, or else after its last newline, so chunks end
+    on section or line boundaries and never split a UTF-8 character.
+
+    Returns:
+        A tuple of (text, next_offset, total_bytes).
+    """
+    with open(path, "rb") as f:
+        total = os.fstat(f.fileno()).st_size
+        f.seek(offset)
+        data = f.read(max_bytes)
+        record_bytes_read(len(data))
+
+    if offset + len(data) < total:
+        cut = data.rfind(b"\n#") + 1
+        if cut <= len(data) // 2:
+            cut = data.rfind(b"\n") + 1
+        if cut > 0:
+            data = data[:cut]
+
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(data) - 3 or e.start == 0:
+            raise
+        data = data[:e.start]
+        text = data.decode("utf-8")
+    return text, offset + len(data), total
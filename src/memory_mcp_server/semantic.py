@@ -0,0 +1,295 @@
+"""Optional vector index of memory sections for similarity search.
+
+Requires NumPy (``pip install memory-mcp-server[semantic]``). Sections are
+embedded with a local sentence-transformers model when
+CURSOR_MEMORY_EMBEDDING_MODEL names one, or else with hashed stem and stem
+bigram features, which need nothing beyond NumPy.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .sections import parse_sections
+    from .search import read_range, stem
+    from .patterns import STOPWORDS
+    from .writer import atomic_write
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.sections import parse_sections
+    from memory_mcp_server.search import read_range, stem
+    from memory_mcp_server.patterns import STOPWORDS
+    from memory_mcp_server.writer import atomic_write
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_VERSION = 2
+HASH_DIMENSIONS = 1024
+MAX_EMBED_CHARS = 2000
+
+# camelCase / PascalCase boundaries, so "TypeError" also yields "type" and "error"
+WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+|[^\W\d_]+", re.UNICODE)
+
+
+def available() -> bool:
+    return np is not None
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder over stems and stem bigrams.
+
+    Hashed vectors carry no notion of how common a feature is, so the index
+    weights query features by inverse document frequency (``uses_idf``).
+    """
+
+    uses_idf = True
+
+    def __init__(self, dimensions: int = HASH_DIMENSIONS):
+        self.dimensions = dimensions
+        self.id = f"hashing-{dimensions}-v1"
+
+    def features(self, text: str) -> Dict[str, float]:
+        words = [word.lower() for word in WORD_RE.findall(text)]
+        stems = [stem(word) for word in words if word not in STOPWORDS and len(word) > 1]
+        weights: Dict[str, float] = {}
+        for index, word in enumerate(stems):
+            weights[word] = weights.get(word, 0.0) + 1.0
+            if index:
+                bigram = f"{stems[index - 1]} {word}"
+                weights[bigram] = weights.get(bigram, 0.0) + 0.5
+        return weights
+
+    def embed(self, texts: List[str]):
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self.features(text).items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = -1.0 if digest & 0x80000000 else 1.0
+                matrix[row, digest % self.dimensions] += sign * (1.0 + np.log(weight))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class ModelEmbedder:
+    """Local CPU sentence-transformers model."""
+
+    uses_idf = False
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.id = f"model-{model_name}"
+
+    def embed(self, texts: List[str]):
+        vectors = self.model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name: str = ""):
+    """Returns the shared embedder, falling back to feature hashing if the model cannot be loaded."""
+    if model_name:
+        try:
+            return ModelEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Could not load embedding model {model_name} ({e}), using hashed features")
+    return HashingEmbedder()
+
+
+def section_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class VectorIndex:
+    """
+    Embeddings of every memory section, one row per section.
+
+    Vectors live in ``vectors.npy`` under ``cache_dir`` and are opened
+    memory-mapped, so the matrix is paged in by the OS rather than loaded.
+    Section metadata and content hashes are kept in ``vectors.json``. When a
+    file changes, its sections are re-parsed but only sections whose hash is
+    not already in the matrix are embedded; the others reuse their rows.
+    """
+
+    def __init__(self, cache_dir: str, embedder):
+        self.matrix_path = os.path.join(cache_dir, "vectors.npy")
+        self.meta_path = os.path.join(cache_dir, "vectors.json")
+        self.embedder = embedder
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.rows: List[Tuple[str, Dict[str, Any]]] = []
+        self.matrix = None
+        self.query_weights = None
+        self.embedded = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def section_count(self) -> int:
+        return len(self.rows)
+
+    def _load(self) -> None:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != VECTOR_INDEX_VERSION or data.get("embedder") != self.embedder.id:
+                return
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable vector index {self.meta_path}: {e}")
+            return
+        files = data.get("files", {})
+        if matrix.shape[0] != sum(len(entry["sections"]) for entry in files.values()):
+            logger.warning(f"Vector index {self.matrix_path} does not match its metadata, rebuilding")
+            return
+        self.files = files
+        self._set_matrix(matrix)
+
+    def _set_matrix(self, matrix) -> None:
+        self.matrix = matrix
+        self.rows = [
+            (path, section)
+            for path, entry in self.files.items()
+            for section in entry["sections"]
+        ]
+        if self.embedder.uses_idf and len(self.rows):
+            document_frequency = np.count_nonzero(matrix, axis=0)
+            self.query_weights = np.log((len(self.rows) + 1) / (document_frequency + 1)).astype(np.float32)
+        else:
+            self.query_weights = None
+
+    def refresh(self, paths: List[str], signatures: Optional[Dict[str, Tuple[int, int]]] = None) -> int:
+        """
+        Brings the index in line with ``paths``, embedding only new sections.
+
+        Returns:
+            The number of files that were (re)indexed or dropped.
+        """
+        with self._lock:
+            wanted = set(paths)
+            files = {path: entry for path, entry in self.files.items() if path in wanted}
+            changed = len(self.files) - len(files)
+            pending: Dict[str, str] = {}
+
+            for path in paths:
+                signature = (signatures or {}).get(path)
+                if signature is None:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        changed += int(files.pop(path, None) is not None)
+                        continue
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                entry = files.get(path)
+                if entry and entry["mtime_ns"] == signature[0] and entry["size"] == signature[1]:
+                    continue
+                try:
+                    # Binary read, as in SearchIndex: chunk offsets feed the byte-based read_range
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    record_bytes_read(len(data))
+                    content = data.decode("utf-8")
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Skipping {path} while embedding: {e}")
+                    changed += int(files.pop(path, None) is not None)
+                    continue
+                sections = []
+                for section in parse_sections(content):
+                    text = " / ".join(section.heading_path) + "\n" + section.text
+                    digest = section_hash(text)
+                    sections.append({
+                        "heading": section.heading,
+                        "heading_path": section.heading_path,
+                        "start_line": section.start_line,
+                        "start_byte": section.start_byte,
+                        "end_byte": section.end_byte,
+                        "hash": digest,
+                    })
+                    pending.setdefault(digest, text[:MAX_EMBED_CHARS])
+                files[path] = {"mtime_ns": signature[0], "size": signature[1], "sections": sections}
+                changed += 1
+
+            if changed:
+                self._rebuild(files, pending)
+            return changed
+
+    def _rebuild(self, files: Dict[str, Dict[str, Any]], pending: Dict[str, str]) -> None:
+        existing = {section["hash"]: row for row, (_, section) in enumerate(self.rows)}
+        missing = [digest for digest in pending if digest not in existing]
+        vectors = self.embedder.embed([pending[digest] for digest in missing]) if missing else None
+        new_rows = {digest: row for row, digest in enumerate(missing)}
+
+        hashes = [section["hash"] for entry in files.values() for section in entry["sections"]]
+        dimensions = vectors.shape[1] if vectors is not None else (self.matrix.shape[1] if self.matrix is not None else 0)
+        matrix = np.zeros((len(hashes), dimensions), dtype=np.float32)
+        is_new = np.array([digest in new_rows for digest in hashes], dtype=bool)
+        if is_new.any():
+            matrix[is_new] = vectors[[new_rows[digest] for digest in hashes if digest in new_rows]]
+        if (~is_new).any():
+            # Unchanged sections are copied from the old matrix instead of re-embedded
+            matrix[~is_new] = self.matrix[[existing[digest] for digest in hashes if digest not in new_rows]]
+
+        os.makedirs(os.path.dirname(self.matrix_path), exist_ok=True)
+        tmp_path = f"{self.matrix_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, self.matrix_path)
+        atomic_write(self.meta_path, json.dumps({
+            "version": VECTOR_INDEX_VERSION,
+            "embedder": self.embedder.id,
+            "files": files,
+        }))
+        self.files = files
+        self.embedded += len(missing)
+        self._set_matrix(np.load(self.matrix_path, mmap_mode="r"))
+
+    def search_many(self, queries: List[str], limit: int = 5) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """Scores every section against all queries with one matrix product."""
+        with self._lock:
+            if self.matrix is None or not self.rows or not queries:
+                return [[] for _ in queries]
+            query_vectors = self.embedder.embed(queries)
+            if self.query_weights is not None:
+                query_vectors *= self.query_weights
+            scores = np.asarray(self.matrix @ query_vectors.T)
+            rows = self.rows
+        results = []
+        for column in range(scores.shape[1]):
+            column_scores = scores[:, column]
+            count = min(limit, len(rows))
+            top = np.argpartition(-column_scores, count - 1)[:count]
+            top = top[np.argsort(-column_scores[top])]
+            results.append([(rows[row][0], rows[row][1], float(column_scores[row])) for row in top if column_scores[row] > 0])
+        return results
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Returns the ``limit`` sections most similar to ``query`` (cosine similarity)."""
+        results = []
+        for path, section, score in self.search_many([query], limit)[0]:
+            results.append({
+                "path": path,
+                "file_name": os.path.basename(path),
+                "heading": section["heading"],
+                "heading_path": section["heading_path"],
+                "line": section["start_line"],
+                "score": round(score, 4),
+                "content": read_range(path, section["start_byte"], section["end_byte"]),
+            })
+        return results
+
@@ -1,20 +1,44 @@
 #!/usr/bin/env python
 
 import os
+import json
+import argparse
+import base64
+import asyncio
 import logging
-import subprocess
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from pathlib import Path
 import glob
+import fnmatch
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from mcp.server.fastmcp import FastMCP, Context
 
 try:
     from .prompts import get_memory_setup_prompt, get_memory_prompt
+    from .search import SearchIndex, read_range, reciprocal_rank_fusion
+    from .cache import FileCache, FileInfo, DEFAULT_CACHE_MAX_BYTES
+    from .writer import WriteBehindBuffer, DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_PENDING_BYTES, FILES_LOCK_NAME, splice_file
+    from .sections import read_chunk
+    from .context import SESSION_FILES, build_context
+    from .watcher import MemoryWatcher, DEFAULT_POLL_INTERVAL
+    from .delta import VersionStore, compute_delta
+    from .workspaces import WorkspaceRegistry, DEFAULT_MAX_WORKSPACES
+    from .metrics import MetricsRegistry, current_call
+    from .journal import JournalSet
 except ImportError:
     # When running directly, use absolute import
     from memory_mcp_server.prompts import get_memory_setup_prompt, get_memory_prompt
+    from memory_mcp_server.search import SearchIndex, read_range, reciprocal_rank_fusion
+    from memory_mcp_server.cache import FileCache, FileInfo, DEFAULT_CACHE_MAX_BYTES
+    from memory_mcp_server.writer import WriteBehindBuffer, DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_PENDING_BYTES, FILES_LOCK_NAME, splice_file
+    from memory_mcp_server.sections import read_chunk
+    from memory_mcp_server.context import SESSION_FILES, build_context
+    from memory_mcp_server.watcher import MemoryWatcher, DEFAULT_POLL_INTERVAL
+    from memory_mcp_server.delta import VersionStore, compute_delta
+    from memory_mcp_server.workspaces import WorkspaceRegistry, DEFAULT_MAX_WORKSPACES
+    from memory_mcp_server.metrics import MetricsRegistry, current_call
+    from memory_mcp_server.journal import JournalSet
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +55,10 @@ class MemoryConfig:
     """Configuration for memory system paths."""
     base_path: str
     
+    @property
+    def memory_path(self) -> str:
+        return os.path.join(self.base_path, ".cursor", "memory")
+    
     @property
     def short_term_path(self) -> str:
         return os.path.join(self.base_path, ".cursor", "memory", "short-term")
@@ -42,40 +70,524 @@ class MemoryConfig:
     @property
     def rules_path(self) -> str:
         return os.path.join(self.base_path, ".cursor", "rules")
+    
+    @property
+    def cache_path(self) -> str:
+        return os.path.join(self.base_path, ".cursor", "memory", ".cache")
+    
+    @property
+    def archive_path(self) -> str:
+        return os.path.join(self.base_path, ".cursor", "memory", "archive")
+    
+    @property
+    def database_path(self) -> str:
+        return os.path.join(self.base_path, ".cursor", "memory", ".cache", "memory.db")
 
-def get_memory_config() -> MemoryConfig:
-    """Get memory configuration with environment variable or current working directory as base."""
-    base_path = os.environ.get('CURSOR_MEMORY_BASE_PATH', os.getcwd())
+# Where listings, loads and keyword searches are answered from: the markdown files, or their SQLite mirror
+MEMORY_BACKENDS = ("files", "sqlite")
+memory_backend = os.environ.get('CURSOR_MEMORY_BACKEND', 'files')
+
+def get_memory_config(workspace: Optional[str] = None) -> MemoryConfig:
+    """
+    Get memory configuration for a workspace root.
+    
+    Falls back to the CURSOR_MEMORY_BASE_PATH environment variable or the
+    current working directory when no workspace is given.
+    """
+    if workspace:
+        base_path = os.path.abspath(os.path.expanduser(workspace))
+        if not os.path.isdir(base_path):
+            raise ValueError(f"Workspace root does not exist: {workspace}")
+    else:
+        base_path = os.path.abspath(os.environ.get('CURSOR_MEMORY_BASE_PATH', os.getcwd()))
     return MemoryConfig(base_path=base_path)
 
+def resolve_memory_file(config: MemoryConfig, file_name: str) -> Optional[Tuple[str, str]]:
+    """Finds a memory file by name in the short-term, long-term or rules directories."""
+    watcher = get_watcher(config)
+    exists = watcher.exists if watcher else os.path.exists
+    for directory, category in [
+        (config.short_term_path, "short-term"),
+        (config.long_term_path, "long-term"),
+        (config.rules_path, "rules")
+    ]:
+        path = os.path.join(directory, file_name)
+        if exists(path):
+            return path, category
+    return None
+
+def collect_memory_files(config: MemoryConfig) -> List[Tuple[str, str]]:
+    """Returns (path, category) pairs for every memory file the tools operate on."""
+    watcher = get_watcher(config)
+    if watcher:
+        # Answered from the watcher snapshot without touching the filesystem
+        files = [(path, "short-term") for path, _, _ in watcher.files(config.short_term_path, "*.md")]
+        files.extend((path, "long-term") for path, _, _ in watcher.files(config.long_term_path, "*.md"))
+        files.extend((path, "rules") for path, _, _ in watcher.files(config.rules_path, "*memory*.mdc"))
+        return sorted(files, key=lambda item: item[0])
+    
+    files = []
+    if os.path.exists(config.short_term_path):
+        files.extend((path, "short-term") for path in glob.glob(os.path.join(config.short_term_path, "*.md")))
+    if os.path.exists(config.long_term_path):
+        files.extend((path, "long-term") for path in glob.glob(os.path.join(config.long_term_path, "*.md")))
+    if os.path.exists(config.rules_path):
+        files.extend((path, "rules") for path in glob.glob(os.path.join(config.rules_path, "*memory*.mdc")))
+    return sorted(files, key=lambda item: item[0])
+
+def memory_file_category(config: MemoryConfig, path: str) -> Optional[str]:
+    """Returns the category of a path collect_memory_files would list, or None for any other file."""
+    directory, name = os.path.split(os.path.normpath(path))
+    for memory_directory, category, pattern in [
+        (config.short_term_path, "short-term", "*.md"),
+        (config.long_term_path, "long-term", "*.md"),
+        (config.rules_path, "rules", "*memory*.mdc")
+    ]:
+        if directory == os.path.normpath(memory_directory) and fnmatch.fnmatch(name, pattern):
+            return category
+    return None
+
+# Contents of recently served versions, used to answer repeat loads with deltas
+version_store = VersionStore()
+
+# Blocking filesystem calls run here so a slow volume never stalls the event loop
+DEFAULT_IO_THREADS = 8
+io_executor = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get('CURSOR_MEMORY_IO_THREADS', DEFAULT_IO_THREADS))),
+    thread_name_prefix="memory-io"
+)
+
+async def run_io(func, *args):
+    """Runs a blocking filesystem function on the I/O thread pool."""
+    call = current_call()
+    if call is not None:
+        # Attribute the time and bytes read to the tool call in progress
+        return await asyncio.get_running_loop().run_in_executor(io_executor, call.run, func, *args)
+    return await asyncio.get_running_loop().run_in_executor(io_executor, func, *args)
+
+# Latency, filesystem and payload metrics of every tool, optionally exported to a file
+server_metrics = MetricsRegistry(
+    export_path=os.environ.get('CURSOR_MEMORY_METRICS_FILE') or None,
+    export_format=os.environ.get('CURSOR_MEMORY_METRICS_FORMAT', 'prometheus'),
+    executor=io_executor
+)
+
+# Per-directory journals let many server processes append at once; None writes files directly
+memory_journal = JournalSet() if os.environ.get('CURSOR_MEMORY_JOURNAL', 'on') != 'off' else None
+
+# Appends from memory_update are coalesced and flushed off the event loop
+memory_writer = WriteBehindBuffer(
+    io_executor,
+    flush_interval=float(os.environ.get('CURSOR_MEMORY_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL * 1000)) / 1000,
+    max_pending_bytes=DEFAULT_MAX_PENDING_BYTES,
+    on_write=lambda path: notify_memory_written(path),
+    journal=memory_journal
+)
+
+MEMORY_TYPES = ("short-term", "long-term")
+
+def get_memory_file_path(config: MemoryConfig, memory_type: str, file_name: str) -> str:
+    """Builds the path of a writable memory file, rejecting names that escape the memory directory."""
+    if memory_type not in MEMORY_TYPES:
+        raise ValueError(f"memory_type must be one of: {', '.join(MEMORY_TYPES)}")
+    if not file_name or os.path.basename(file_name) != file_name or file_name in (".", ".."):
+        raise ValueError(f"Invalid memory file name: {file_name}")
+    return os.path.join(config.memory_path, memory_type, file_name)
+
+# Chunked loads never return less than this per call so every page makes progress
+DEFAULT_CHUNK_BYTES = 64 * 1024
+MIN_CHUNK_BYTES = 256
+
+def encode_cursor(path: str, offset: int) -> str:
+    """Encodes a load position as an opaque continuation cursor."""
+    payload = json.dumps({"path": path, "offset": offset}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decodes a continuation cursor produced by encode_cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return payload["path"], int(payload["offset"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+async def load_memory_chunks(ctx: Context, memory_files: List[Tuple[str, str]], max_bytes: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Loads memory files page by page, returning at most max_bytes of content.
+    
+    Files are read with seek() from the cursor position, so server memory stays
+    bounded by max_bytes regardless of file size.
+    """
+    max_bytes = max(max_bytes, MIN_CHUNK_BYTES)
+    start_index, offset = 0, 0
+    if cursor:
+        cursor_path, offset = decode_cursor(cursor)
+        paths = [path for path, _ in memory_files]
+        if cursor_path not in paths:
+            raise ValueError(f"Cursor refers to a file that is no longer available: {cursor_path}")
+        start_index = paths.index(cursor_path)
+    
+    loaded_files = {}
+    remaining = max_bytes
+    next_cursor = None
+    for index in range(start_index, len(memory_files)):
+        file_path, category = memory_files[index]
+        if remaining < MIN_CHUNK_BYTES and loaded_files:
+            next_cursor = encode_cursor(file_path, offset)
+            break
+        try:
+            content, next_offset, total_bytes = await run_io(read_chunk, file_path, offset, remaining)
+        except (OSError, ValueError) as e:
+            await ctx.error(f"Failed to load {file_path}: {str(e)}")
+            offset = 0
+            continue
+        
+        loaded_files[os.path.basename(file_path)] = {
+            "content": content,
+            "category": category,
+            "path": file_path,
+            "size": len(content),
+            "lines": len(content.splitlines()),
+            "offset": offset,
+            "next_offset": next_offset,
+            "total_bytes": total_bytes,
+            "complete": next_offset >= total_bytes
+        }
+        remaining -= next_offset - offset
+        if next_offset < total_bytes:
+            next_cursor = encode_cursor(file_path, next_offset)
+            break
+        offset = 0
+    
+    total_content = sum(f["size"] for f in loaded_files.values())
+    total_lines = sum(f["lines"] for f in loaded_files.values())
+    
+    await ctx.info(f"Loaded {len(loaded_files)} memory file chunks - {max_bytes - remaining} bytes" + (", more available" if next_cursor else ""))
+    
+    return {
+        "loaded_files": loaded_files,
+        "next_cursor": next_cursor,
+        "summary": {
+            "files_loaded": len(loaded_files),
+            "total_characters": total_content,
+            "total_lines": total_lines,
+            "bytes_returned": max_bytes - remaining,
+            "complete": next_cursor is None
+        }
+    }
+
+# File contents shared by list_memory_files and load_memory_files
+file_cache = FileCache(max_bytes=int(os.environ.get('CURSOR_MEMORY_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)))
+
+@dataclass
+class WorkspaceState:
+    """Watcher, index and trackers of one workspace, each created on first use."""
+    config: MemoryConfig
+    watcher: Optional[MemoryWatcher] = None
+    search_index: Optional[SearchIndex] = None
+    # Components whose modules are imported on first use are typed as Any
+    compactor: Optional[Any] = None
+    pattern_tracker: Optional[Any] = None
+    vector_index: Optional[Any] = None
+    known_issues: Optional[Any] = None
+    model_store: Optional[Any] = None
+    archive: Optional[Any] = None
+    store: Optional[Any] = None
+    # Whether the mirror matches the watcher snapshot; cleared by every change event
+    store_current: bool = False
+    stats: Optional[Any] = None
+
+# Watchers are started for every workspace once main() enables watching
+watch_workspaces = False
+
+def open_workspace(base_path: str) -> WorkspaceState:
+    state = WorkspaceState(config=MemoryConfig(base_path=base_path))
+    if memory_journal is not None:
+        # Records left by a crashed or exited process are drained on the next flush
+        for directory in (state.config.short_term_path, state.config.long_term_path):
+            if memory_journal.journal(directory).pending():
+                memory_writer.request_drain()
+    if watch_workspaces:
+        state.watcher = start_watcher(state.config)
+    return state
+
+def close_workspace(state: WorkspaceState) -> None:
+    """Releases an evicted workspace; its files are re-read from disk on next use."""
+    def release() -> None:
+        if state.watcher:
+            state.watcher.stop()
+        if state.store:
+            state.store.close()
+        file_cache.invalidate_prefix(os.path.join(state.config.base_path, ".cursor") + os.sep)
+    # Stopping a watcher joins its thread, so keep it off the caller's path
+    io_executor.submit(release)
+
+# One server process can serve many workspaces; idle ones are evicted LRU
+workspaces: WorkspaceRegistry[WorkspaceState] = WorkspaceRegistry(
+    open_workspace,
+    max_workspaces=int(os.environ.get('CURSOR_MEMORY_MAX_WORKSPACES', DEFAULT_MAX_WORKSPACES)),
+    on_evict=close_workspace
+)
+
+def get_workspace_config(workspace: Optional[str] = None) -> MemoryConfig:
+    """Resolves the config a tool call operates on and marks its workspace as recently used."""
+    config = get_memory_config(workspace)
+    get_workspace(config)
+    return config
+
+def get_workspace(config: MemoryConfig) -> WorkspaceState:
+    """Returns the state of a workspace, marking it as recently used."""
+    return workspaces.get(config.base_path)
+
+def get_watcher(config: MemoryConfig) -> Optional[MemoryWatcher]:
+    """Returns the running watcher for a workspace, if any."""
+    state = workspaces.peek(config.base_path)
+    watcher = state.watcher if state else None
+    return watcher if watcher is not None and watcher.running else None
+
+def start_watcher(config: MemoryConfig) -> Optional[MemoryWatcher]:
+    """Starts watching a workspace unless CURSOR_MEMORY_WATCH is off."""
+    backend = os.environ.get('CURSOR_MEMORY_WATCH', 'auto')
+    if backend == "off":
+        return None
+    watcher = MemoryWatcher(
+        [config.short_term_path, config.long_term_path, config.rules_path],
+        config.base_path,
+        on_change=lambda path: memory_file_changed(config, path),
+        poll_interval=float(os.environ.get('CURSOR_MEMORY_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)),
+        backend=backend
+    )
+    watcher.start()
+    return watcher
+
+def memory_file_changed(config: MemoryConfig, path: str) -> None:
+    """Watcher callback: forgets the cached content of a changed file and re-counts its stats."""
+    file_cache.invalidate(path)
+    state = workspaces.peek(config.base_path)
+    if state:
+        state.store_current = False
+    if state and state.stats and state.stats.reconciled:
+        category = memory_file_category(config, path)
+        if category:
+            state.stats.refresh(path, category)
+
+def notify_memory_written(path: str) -> None:
+    """Updates stats manifests and watcher snapshots right after the server itself wrote a file."""
+    for state in workspaces.values():
+        state.store_current = False
+        if state.stats and state.stats.reconciled:
+            category = memory_file_category(state.config, path)
+            if category:
+                # Before the watcher refresh, so its change event finds the record already current
+                state.stats.refresh(path, category)
+        if state.watcher:
+            state.watcher.refresh_path(path)
+
+def memory_file_info(config: MemoryConfig, path: str) -> FileInfo:
+    """Returns file metadata, from the watcher snapshot and cache when both are warm."""
+    watcher = get_watcher(config)
+    signature = watcher.signature(path) if watcher else None
+    if signature:
+        info = file_cache.cached_info(path, *signature)
+        if info:
+            return info
+    return file_cache.info(path)
+
+def get_search_index(config: MemoryConfig) -> SearchIndex:
+    """Returns the search index for a memory workspace, loading it from disk on first use."""
+    state = get_workspace(config)
+    if state.search_index is None:
+        state.search_index = SearchIndex(os.path.join(config.cache_path, "search-index.json"))
+    return state.search_index
+
+def get_compactor(config: MemoryConfig) -> Any:
+    """Returns the working-memory compactor for a workspace, loading its checkpoint on first use."""
+    try:
+        from .compaction import WorkingMemoryCompactor
+    except ImportError:
+        from memory_mcp_server.compaction import WorkingMemoryCompactor
+    state = get_workspace(config)
+    if state.compactor is None:
+        state.compactor = WorkingMemoryCompactor(
+            os.path.join(config.cache_path, "compaction-state.json"),
+            get_archive(config)
+        )
+    return state.compactor
+
+def get_archive(config: MemoryConfig) -> Any:
+    """Returns the cold archive of a workspace."""
+    # Imported on first use, like the modules below: gzip and the parsers are not needed to start
+    try:
+        from .archive import ColdArchive
+    except ImportError:
+        from memory_mcp_server.archive import ColdArchive
+    state = get_workspace(config)
+    if state.archive is None:
+        state.archive = ColdArchive(config.archive_path)
+    return state.archive
+
+def get_pattern_tracker(config: MemoryConfig) -> Any:
+    """Returns the loaded pattern tracker for a workspace, seeding it from short-term files on first use."""
+    try:
+        from .patterns import PatternTracker
+    except ImportError:
+        from memory_mcp_server.patterns import PatternTracker
+    state = get_workspace(config)
+    if state.pattern_tracker is None:
+        state.pattern_tracker = PatternTracker(os.path.join(config.cache_path, "patterns.jsonl"))
+    tracker = state.pattern_tracker
+    if not tracker.loaded:
+        tracker.load(glob.glob(os.path.join(config.short_term_path, "*.md")))
+    return tracker
+
+def get_vector_index(config: MemoryConfig) -> Optional[Any]:
+    """Returns the section vector index for a workspace, or None when NumPy is not installed."""
+    # Imported on first use: NumPy is optional and slow to import
+    try:
+        from . import semantic
+    except ImportError:
+        from memory_mcp_server import semantic
+    if not semantic.available():
+        return None
+    state = get_workspace(config)
+    if state.vector_index is None:
+        embedder = semantic.get_embedder(os.environ.get('CURSOR_MEMORY_EMBEDDING_MODEL', ''))
+        state.vector_index = semantic.VectorIndex(config.cache_path, embedder)
+    return state.vector_index
+
+def get_known_issues(config: MemoryConfig) -> Any:
+    """Returns the parsed known-issues cache of a workspace."""
+    try:
+        from .issues import KnownIssueCache
+    except ImportError:
+        from memory_mcp_server.issues import KnownIssueCache
+    state = get_workspace(config)
+    if state.known_issues is None:
+        state.known_issues = KnownIssueCache()
+    return state.known_issues
+
+def get_model_store(config: MemoryConfig) -> Any:
+    """Returns the parse-tree store of a workspace; trees are persisted under .cache/model."""
+    try:
+        from .model import ModelStore
+    except ImportError:
+        from memory_mcp_server.model import ModelStore
+    state = get_workspace(config)
+    if state.model_store is None:
+        state.model_store = ModelStore(os.path.join(config.cache_path, "model"))
+    return state.model_store
+
+def get_memory_store(config: MemoryConfig) -> Optional[Any]:
+    """Returns the SQLite mirror of a workspace, or None unless CURSOR_MEMORY_BACKEND is sqlite."""
+    if memory_backend != "sqlite":
+        return None
+    try:
+        from .store import SqliteMemoryStore
+    except ImportError:
+        from memory_mcp_server.store import SqliteMemoryStore
+    state = get_workspace(config)
+    if state.store is None:
+        state.store = SqliteMemoryStore(config.database_path)
+    return state.store
+
+def sync_memory_store(config: MemoryConfig) -> Optional[Any]:
+    """
+    Returns the workspace's SQLite mirror after re-mirroring files whose stat signature changed.
+    
+    While the watcher runs, a synced mirror is returned as is until a change
+    event or server write arrives; without it, every call lists and stats
+    the memory files.
+    """
+    store = get_memory_store(config)
+    if store is None:
+        return None
+    state = get_workspace(config)
+    watcher = get_watcher(config)
+    if watcher and state.store_current:
+        return store
+    # Set before listing, so a change arriving during the sync clears it again
+    state.store_current = watcher is not None
+    memory_files = collect_memory_files(config)
+    try:
+        mirrored = store.sync([
+            (path, category, watcher.signature(path) if watcher else None)
+            for path, category in memory_files
+        ])
+    except BaseException:
+        state.store_current = False
+        raise
+    if mirrored:
+        logger.debug(f"Mirrored {mirrored} memory files into {store.db_path}")
+    return store
+
+def sync_stats_manifest(config: MemoryConfig, memory_files: Optional[List[Tuple[str, str]]] = None) -> Any:
+    """
+    Returns the stats manifest of a workspace, reconciled with the memory files.
+    
+    While the watcher runs, a reconciled manifest is kept current by its
+    change events and by server writes, so it is returned as is.
+    """
+    try:
+        from .stats import StatsManifest
+    except ImportError:
+        from memory_mcp_server.stats import StatsManifest
+    state = get_workspace(config)
+    if state.stats is None:
+        state.stats = StatsManifest(os.path.join(config.cache_path, "stats.json"))
+    watcher = get_watcher(config)
+    if state.stats.reconciled and watcher:
+        return state.stats
+    if memory_files is None:
+        memory_files = collect_memory_files(config)
+    updated = state.stats.reconcile([
+        (path, category, watcher.signature(path) if watcher else None)
+        for path, category in memory_files
+    ])
+    if updated:
+        logger.debug(f"Updated stats of {updated} memory files")
+    return state.stats
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
 # Prompts are now imported from prompts.py module
 
 @mcp.tool(description="Validates if the Cursor memory system directories exist and are properly configured. Returns setup status and guides next steps. Essential for determining if memory system initialization is needed.")
-async def validate_memory_system(ctx: Context) -> Dict[str, Any]:
+@server_metrics.instrument
+async def validate_memory_system(ctx: Context, workspace: Optional[str] = None) -> Dict[str, Any]:
     """
     Validates if the Cursor memory system directories exist and are properly configured.
     
     Args:
         ctx: The MCP context.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
         
     Returns:
         A dictionary containing validation status and guidance.
     """
     await ctx.info("Validating Cursor memory system setup")
     
-    config = get_memory_config()
+    config = await run_io(get_workspace_config, workspace)
     await ctx.info(f"Memory system base path: {config.base_path}")
     
-    # Check if directories exist
-    short_term_exists = os.path.exists(config.short_term_path)
-    long_term_exists = os.path.exists(config.long_term_path)
-    rules_exists = os.path.exists(config.rules_path)
-    
-    # Check core files
-    project_knowledge_exists = os.path.exists(os.path.join(config.long_term_path, "project-knowledge.md"))
-    known_issues_exists = os.path.exists(os.path.join(config.long_term_path, "known-issues.md"))
-    working_memory_exists = os.path.exists(os.path.join(config.short_term_path, "working-memory.md"))
-    memory_rule_exists = os.path.exists(os.path.join(config.rules_path, "intelligent-memory.mdc"))
+    paths = [
+        config.short_term_path,
+        config.long_term_path,
+        config.rules_path,
+        os.path.join(config.long_term_path, "project-knowledge.md"),
+        os.path.join(config.long_term_path, "known-issues.md"),
+        os.path.join(config.short_term_path, "working-memory.md"),
+        os.path.join(config.rules_path, "intelligent-memory.mdc")
+    ]
+    watcher = get_watcher(config)
+    if watcher:
+        checks = [watcher.exists(path) for path in paths]
+    else:
+        # Check directories and core files concurrently
+        checks = await asyncio.gather(*(run_io(os.path.exists, path) for path in paths))
+    (
+        short_term_exists, long_term_exists, rules_exists,
+        project_knowledge_exists, known_issues_exists, working_memory_exists, memory_rule_exists
+    ) = checks
     
     is_configured = all([
         short_term_exists, long_term_exists, rules_exists,
@@ -118,13 +630,15 @@ async def validate_memory_system(ctx: Context) -> Dict[str, Any]:
     return status
 
 @mcp.tool(description="Returns the appropriate prompt based on memory system status. If memory system exists, returns the active memory prompt. If not configured, returns the complete setup instructions. Use this to get the right guidance for the current state.")
-async def get_memory_prompt_for_current_state(ctx: Context) -> Dict[str, Any]:
+@server_metrics.instrument
+async def get_memory_prompt_for_current_state(ctx: Context, workspace: Optional[str] = None) -> Dict[str, Any]:
     """
     Returns the appropriate prompt based on memory system status.
     If configured, returns the active memory prompt. If not, returns setup instructions.
     
     Args:
         ctx: The MCP context.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
         
     Returns:
         A dictionary containing the appropriate prompt and system status.
@@ -132,7 +646,7 @@ async def get_memory_prompt_for_current_state(ctx: Context) -> Dict[str, Any]:
     await ctx.info("Determining appropriate memory prompt for current state")
     
     # First validate the current state
-    validation_result = await validate_memory_system(ctx)
+    validation_result = await validate_memory_system(ctx, workspace=workspace)
     
     if validation_result["configured"]:
         await ctx.info("Memory system is configured - returning active memory prompt")
@@ -150,39 +664,40 @@ async def get_memory_prompt_for_current_state(ctx: Context) -> Dict[str, Any]:
     }
 
 @mcp.tool(description="Lists all available memory files in both short-term and long-term directories with their metadata. Shows file sizes, modification dates, and basic statistics. Essential for understanding what memory content is available for loading and consultation.")
-async def list_memory_files(ctx: Context) -> Dict[str, Any]:
+@server_metrics.instrument
+async def list_memory_files(ctx: Context, workspace: Optional[str] = None) -> Dict[str, Any]:
     """
     Lists all available memory files in both short-term and long-term directories.
     
     Args:
         ctx: The MCP context.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
         
     Returns:
         A dictionary containing lists of memory files with metadata.
     """
     await ctx.info("Listing all available memory files")
     
-    config = get_memory_config()
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
+    
+    def describe_file(file_path: str, size: int, mtime_ns: int, line_count: int, char_count: int) -> Dict[str, Any]:
+        return {
+            "path": file_path,
+            "name": os.path.basename(file_path),
+            "size_bytes": size,
+            "size_kb": round(size / 1024, 2),
+            "modified": datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+            "line_count": line_count,
+            "char_count": char_count,
+            "exists": True
+        }
     
     def get_file_info(file_path: str) -> Dict[str, Any]:
         """Get metadata for a memory file."""
         try:
-            stat = os.stat(file_path)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                line_count = len(content.splitlines())
-                char_count = len(content)
-            
-            return {
-                "path": file_path,
-                "name": os.path.basename(file_path),
-                "size_bytes": stat.st_size,
-                "size_kb": round(stat.st_size / 1024, 2),
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "line_count": line_count,
-                "char_count": char_count,
-                "exists": True
-            }
+            info = memory_file_info(config, file_path)
+            return describe_file(file_path, info.size, info.mtime_ns, info.line_count, info.char_count)
         except Exception as e:
             return {
                 "path": file_path,
@@ -191,23 +706,37 @@ async def list_memory_files(ctx: Context) -> Dict[str, Any]:
                 "exists": False
             }
     
-    # Get short-term memory files
-    short_term_files = []
-    if os.path.exists(config.short_term_path):
-        for file_path in glob.glob(os.path.join(config.short_term_path, "*.md")):
-            short_term_files.append(get_file_info(file_path))
+    store = await run_io(sync_memory_store, config)
+    if store is not None:
+        # One indexed query; only files whose signature changed were re-read by the sync
+        rows = await run_io(store.list_files)
+        memory_files = [(row["path"], row["category"]) for row in rows]
+        file_infos = [
+            describe_file(row["path"], row["size"], row["mtime_ns"], row["line_count"], row["char_count"])
+            for row in rows
+        ]
+    else:
+        memory_files = await run_io(collect_memory_files, config)
+        # Counts come from the persisted stats manifest; only files it cannot describe are read
+        manifest = await run_io(sync_stats_manifest, config, memory_files)
+        file_infos = []
+        for path, _ in memory_files:
+            record = manifest.file_stats(path)
+            if record is None:
+                file_infos.append(await run_io(get_file_info, path))
+            else:
+                file_infos.append(describe_file(path, record["size"], record["mtime_ns"], record["line_count"], record["char_count"]))
     
-    # Get long-term memory files
+    short_term_files = []
     long_term_files = []
-    if os.path.exists(config.long_term_path):
-        for file_path in glob.glob(os.path.join(config.long_term_path, "*.md")):
-            long_term_files.append(get_file_info(file_path))
-    
-    # Get memory rules
     memory_rules = []
-    if os.path.exists(config.rules_path):
-        for file_path in glob.glob(os.path.join(config.rules_path, "*memory*.mdc")):
-            memory_rules.append(get_file_info(file_path))
+    for (_, category), file_info in zip(memory_files, file_infos):
+        if category == "short-term":
+            short_term_files.append(file_info)
+        elif category == "long-term":
+            long_term_files.append(file_info)
+        else:
+            memory_rules.append(file_info)
     
     total_files = len(short_term_files) + len(long_term_files) + len(memory_rules)
     total_size = sum(f.get("size_bytes", 0) for f in short_term_files + long_term_files + memory_rules if f.get("exists", False))
@@ -227,14 +756,19 @@ async def list_memory_files(ctx: Context) -> Dict[str, Any]:
         }
     }
 
-@mcp.tool(description="Loads and returns the contents of specific memory files or all memory files if no specific files are requested. Essential for reading memory content into the current context. Supports both individual file loading and bulk loading for session initialization.")
-async def load_memory_files(ctx: Context, file_names: Optional[List[str]] = None) -> Dict[str, Any]:
+@mcp.tool(description="Loads and returns the contents of specific memory files or all memory files if no specific files are requested. Essential for reading memory content into the current context. Supports both individual file loading and bulk loading for session initialization. Every file carries a version token: pass the tokens you already hold as known_versions ({file_name: version}) to get unchanged markers or deltas instead of full content. Pass max_bytes to page through large files in section-bounded chunks, then call again with the returned next_cursor until it is null.")
+@server_metrics.instrument
+async def load_memory_files(ctx: Context, file_names: Optional[List[str]] = None, max_bytes: Optional[int] = None, cursor: Optional[str] = None, known_versions: Optional[Dict[str, str]] = None, workspace: Optional[str] = None) -> Dict[str, Any]:
     """
     Loads and returns the contents of specific memory files or all memory files.
     
     Args:
         ctx: The MCP context.
         file_names: Optional list of specific file names to load. If None, loads all memory files.
+        max_bytes: Optional byte budget for this call. Enables chunked mode.
+        cursor: Continuation cursor returned by a previous chunked call.
+        known_versions: Version tokens from a previous load, keyed by file name.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
         
     Returns:
         A dictionary containing the loaded memory file contents.
@@ -244,123 +778,212 @@ async def load_memory_files(ctx: Context, file_names: Optional[List[str]] = None
     else:
         await ctx.info("Loading all available memory files")
     
-    config = get_memory_config()
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
     loaded_files = {}
     
-    async def load_file_content(file_path: str, category: str) -> None:
+    def file_entry(file_path: str, category: str, content: str, char_count: int, line_count: int, version: str) -> Dict[str, Any]:
+        """Builds the response entry of a file, as a delta or unchanged marker when the client holds a version."""
+        entry = {
+            "content": content,
+            "category": category,
+            "path": file_path,
+            "size": char_count,
+            "lines": line_count,
+            "version": version
+        }
+        version_store.remember(version, content)
+        
+        known = (known_versions or {}).get(os.path.basename(file_path))
+        if known == version:
+            del entry["content"]
+            entry["unchanged"] = True
+        elif known:
+            previous = version_store.get(known)
+            delta = compute_delta(previous, content) if previous is not None else None
+            if delta:
+                del entry["content"]
+                entry["base_version"] = known
+                entry["delta"] = delta
+        return entry
+    
+    def read_file_content(file_path: str, category: str) -> Optional[Dict[str, Any]]:
         """Load content from a memory file."""
+        if not os.path.exists(file_path):
+            return None
+        info, content = file_cache.read(file_path)
+        return file_entry(file_path, category, content, info.char_count, info.line_count, info.version)
+    
+    def read_store_content(store: Any, memory_files: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Load the content of memory files from the SQLite mirror in one query."""
+        rows = store.read([path for path, _ in memory_files])
+        return [
+            file_entry(path, category, row["content"], row["char_count"], row["line_count"], row["version"])
+            for path, category in memory_files
+            for row in [rows.get(path)] if row
+        ]
+    
+    async def load_file_content(file_path: str, category: str) -> Optional[Dict[str, Any]]:
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    file_name = os.path.basename(file_path)
-                    loaded_files[file_name] = {
-                        "content": content,
-                        "category": category,
-                        "path": file_path,
-                        "size": len(content),
-                        "lines": len(content.splitlines())
-                    }
-                    await ctx.debug(f"Loaded {file_name} ({len(content)} chars)")
+            return await run_io(read_file_content, file_path, category)
         except Exception as e:
             await ctx.error(f"Failed to load {file_path}: {str(e)}")
+            return None
+    
+    store = await run_io(sync_memory_store, config)
     
     # If specific files requested, load only those
     if file_names:
-        for file_name in file_names:
-            # Try to find the file in short-term, long-term, or rules directories
-            possible_paths = [
-                os.path.join(config.short_term_path, file_name),
-                os.path.join(config.long_term_path, file_name),
-                os.path.join(config.rules_path, file_name)
-            ]
-            
-            found = False
-            for path in possible_paths:
-                if os.path.exists(path):
-                    if "short-term" in path:
-                        await load_file_content(path, "short-term")
-                    elif "long-term" in path:
-                        await load_file_content(path, "long-term")
-                    else:
-                        await load_file_content(path, "rules")
-                    found = True
-                    break
-            
-            if not found:
+        # Try to find each file in short-term, long-term, or rules directories
+        if store is not None:
+            found = await run_io(store.resolve, file_names)
+            resolved = [found.get(file_name) for file_name in file_names]
+        else:
+            resolved = await asyncio.gather(*(run_io(resolve_memory_file, config, file_name) for file_name in file_names))
+        memory_files = []
+        for file_name, match in zip(file_names, resolved):
+            if match:
+                memory_files.append(match)
+            else:
                 await ctx.warning(f"Memory file not found: {file_name}")
+    elif store is not None:
+        # Load every mirrored short-term, long-term and rule file
+        memory_files = [(row["path"], row["category"]) for row in await run_io(store.list_files)]
+    else:
+        # Load all short-term, long-term and rule files
+        memory_files = await run_io(collect_memory_files, config)
+    
+    if max_bytes is not None or cursor:
+        return await load_memory_chunks(ctx, memory_files, max_bytes or DEFAULT_CHUNK_BYTES, cursor)
     
+    if store is not None:
+        entries = await run_io(read_store_content, store, memory_files)
     else:
-        # Load all memory files
-        # Load short-term files
-        if os.path.exists(config.short_term_path):
-            for file_path in glob.glob(os.path.join(config.short_term_path, "*.md")):
-                await load_file_content(file_path, "short-term")
-        
-        # Load long-term files
-        if os.path.exists(config.long_term_path):
-            for file_path in glob.glob(os.path.join(config.long_term_path, "*.md")):
-                await load_file_content(file_path, "long-term")
-        
-        # Load memory rules
-        if os.path.exists(config.rules_path):
-            for file_path in glob.glob(os.path.join(config.rules_path, "*memory*.mdc")):
-                await load_file_content(file_path, "rules")
+        # Independent files are read concurrently
+        entries = await asyncio.gather(*(load_file_content(path, category) for path, category in memory_files))
+    for entry in entries:
+        if entry:
+            file_name = os.path.basename(entry["path"])
+            loaded_files[file_name] = entry
+            await ctx.debug(f"Loaded {file_name} ({entry['size']} chars)")
     
     total_content = sum(f["size"] for f in loaded_files.values())
     total_lines = sum(f["lines"] for f in loaded_files.values())
+    unchanged = sum(1 for f in loaded_files.values() if f.get("unchanged"))
+    deltas = sum(1 for f in loaded_files.values() if "delta" in f)
     
     await ctx.info(f"Successfully loaded {len(loaded_files)} memory files - {total_content} chars, {total_lines} lines")
+    if known_versions:
+        await ctx.info(f"{unchanged} files unchanged, {deltas} returned as deltas")
     
     return {
         "loaded_files": loaded_files,
         "summary": {
             "files_loaded": len(loaded_files),
             "total_characters": total_content,
-            "total_lines": total_lines
+            "total_lines": total_lines,
+            "files_unchanged": unchanged,
+            "files_as_delta": deltas
         }
     }
 
-@mcp.tool(description="Updates memory files - returns executable script")
-async def memory_update(ctx: Context, file_name: str, content: str, add_timestamp: bool = True, memory_type: str = "short-term") -> Dict[str, Any]:
+@mcp.tool(description="Updates memory files. With write=True the entry is appended directly on the server (recommended, no extra round trip); otherwise returns an executable script for the client to run.")
+@server_metrics.instrument
+async def memory_update(ctx: Context, file_name: str, content: str, add_timestamp: bool = True, memory_type: str = "short-term", write: bool = False, workspace: Optional[str] = None) -> Dict[str, Any]:
     """
-    Returns an executable script for memory updates.
+    Appends an entry to a memory file, or returns an executable script for memory updates.
+    
+    Args:
+        ctx: The MCP context.
+        file_name: Memory file name, e.g. working-memory.md.
+        content: Markdown content to append.
+        add_timestamp: Whether to prefix the entry with a ## timestamp header.
+        memory_type: Either short-term or long-term.
+        write: Append on the server instead of returning a script.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary describing the write, or the script and command to run.
     """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     timestamp_prefix = ""
     if add_timestamp:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         timestamp_prefix = f"## {timestamp}\n"
     
     formatted_content = f"{timestamp_prefix}{content}"
     file_path = f".cursor/memory/{memory_type}/{file_name}"
+    config = await run_io(get_workspace_config, workspace)
+    if workspace:
+        # The client may not be running inside the workspace it names
+        file_path = os.path.join(config.base_path, file_path)
+    # Validated before anything is recorded, so rejected calls leave no trace
+    absolute_path = get_memory_file_path(config, memory_type, file_name)
+    
+    if write:
+        await memory_writer.append(absolute_path, formatted_content)
+        await ctx.info(f"Memory entry queued for {file_path}")
+        if memory_type == "short-term":
+            # Feed the promotion detector with just this entry; script-mode entries are
+            # not recorded, since the client may never run the script
+            def track_entry() -> None:
+                get_pattern_tracker(config).add_entry(file_name, content, timestamp)
+            try:
+                await run_io(track_entry)
+            except OSError as e:
+                await ctx.warning(f"Could not record entry for pattern tracking: {str(e)}")
+        return {
+            "written": True,
+            "file_path": file_path,
+            "absolute_path": absolute_path,
+            "bytes": len(formatted_content.encode("utf-8"))
+        }
     
     # Gerar script Python
     python_script = f'''#!/usr/bin/env python3
 import os
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # Memory update script
-file_path = "{file_path}"
-content = """{formatted_content}"""
+file_path = {file_path!r}
+content = {formatted_content!r}
 
 # Create directory if it doesn't exist
 Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
-# Append to file
-mode = "a" if os.path.exists(file_path) else "w"
-with open(file_path, mode) as f:
-    if mode == "a" and os.path.getsize(file_path) > 0:
-        f.write("\\n\\n")
-    f.write(content)
+# Append the whole entry in one write, holding the directory lock shared with the server
+lock_fd = os.open(os.path.join(os.path.dirname(file_path), {FILES_LOCK_NAME!r}), os.O_RDWR | os.O_CREAT, 0o644)
+try:
+    if fcntl:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        prefix = "\\n\\n" if os.fstat(fd).st_size > 0 else ""
+        os.write(fd, (prefix + content).encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+finally:
+    os.close(lock_fd)
 
 print(f"✅ Memory updated: {{file_path}}")
 '''
     
-    # Gerar comando bash
-    bash_command = f"""mkdir -p $(dirname "{file_path}") && cat >> "{file_path}" << 'EOF'
+    # Gerar comando bash (delimitador que não aparece no conteúdo)
+    delimiter = "EOF"
+    while delimiter in formatted_content.splitlines():
+        delimiter += "_MEMORY"
+    lock_path = os.path.join(os.path.dirname(file_path), FILES_LOCK_NAME)
+    # flock(1) is used when installed so the append cannot interleave with the server's writes
+    bash_command = f"""mkdir -p $(dirname "{file_path}") && {{ command -v flock >/dev/null && flock 9; cat >> "{file_path}" << '{delimiter}'
 
 {formatted_content}
-EOF"""
+{delimiter}
+}} 9>>"{lock_path}\""""
     
     return {
         "instruction": f"Run this script to update memory at {file_path}:",
@@ -369,9 +992,832 @@ EOF"""
         "file_path": file_path
     }
 
+@mcp.tool(description="Appends several entries in one call, e.g. every error, decision and TODO of a debugging burst. Each entry is {file_name, content, memory_type='short-term', add_timestamp=True}. Entries are grouped by target file and written on the server with one append and fsync per file, in the order given. All entries are validated before anything is written.")
+@server_metrics.instrument
+async def memory_update_batch(ctx: Context, entries: List[Dict[str, Any]], workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Appends a batch of entries to memory files on the server.
+    
+    Args:
+        ctx: The MCP context.
+        entries: Entries with file_name, content and optional memory_type and add_timestamp.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary summarizing the entries and bytes written per file.
+    """
+    await ctx.info(f"Writing batch of {len(entries)} memory entries")
+    
+    config = await run_io(get_workspace_config, workspace)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    queued: List[Tuple[str, str]] = []
+    tracked: List[Tuple[str, str]] = []
+    files: Dict[str, Dict[str, int]] = {}
+    for position, entry in enumerate(entries):
+        file_name, content = entry.get("file_name"), entry.get("content")
+        if not isinstance(file_name, str) or not isinstance(content, str):
+            raise ValueError(f"Entry {position} needs string file_name and content")
+        memory_type = entry.get("memory_type", "short-term")
+        absolute_path = get_memory_file_path(config, memory_type, file_name)
+        formatted_content = f"## {timestamp}\n{content}" if entry.get("add_timestamp", True) else content
+        queued.append((absolute_path, formatted_content))
+        if memory_type == "short-term":
+            tracked.append((file_name, content))
+        stats = files.setdefault(absolute_path, {"entries": 0, "bytes": 0})
+        stats["entries"] += 1
+        stats["bytes"] += len(formatted_content.encode("utf-8"))
+    
+    if tracked:
+        # Feed the promotion detector with just these entries
+        def track_entries() -> None:
+            tracker = get_pattern_tracker(config)
+            for file_name, content in tracked:
+                tracker.add_entry(file_name, content, timestamp)
+        try:
+            await run_io(track_entries)
+        except OSError as e:
+            await ctx.warning(f"Could not record entries for pattern tracking: {str(e)}")
+    
+    await memory_writer.append_batch(queued)
+    
+    await ctx.info(f"Wrote {len(queued)} entries to {len(files)} files")
+    
+    return {
+        "written": True,
+        "files": files,
+        "summary": {
+            "entries_written": len(queued),
+            "files_written": len(files),
+            "bytes_written": sum(stats["bytes"] for stats in files.values())
+        }
+    }
+
+@mcp.tool(description="Searches memory files and returns only the most relevant sections (split on ## and ### headings). mode='keyword' ranks with BM25; mode='semantic' ranks by embedding similarity and also finds paraphrases (e.g. 'payment validation crash' for 'TypeError in payment handler'); mode='hybrid' fuses both. Use this instead of loading every file when looking for a specific decision, error or pattern.")
+@server_metrics.instrument
+async def search_memory(ctx: Context, query: str, limit: int = 5, mode: str = "keyword", workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Searches memory sections using a persistent inverted index (or, with the
+    sqlite backend, the mirror's FTS5 index) and, optionally, a vector index.
+    
+    Args:
+        ctx: The MCP context.
+        query: Free-text search query.
+        limit: Maximum number of sections to return.
+        mode: keyword, semantic or hybrid. Semantic modes need NumPy.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the ranked sections with file and heading anchors.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}")
+    await ctx.info(f"Searching memory for: {query} ({mode})")
+    
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
+    
+    paths: List[str] = []
+    signatures = None
+    if mode != "keyword" or memory_backend != "sqlite":
+        # The SQLite mirror lists the files itself when it syncs
+        memory_files = await run_io(collect_memory_files, config)
+        paths = [path for path, _ in memory_files]
+        watcher = get_watcher(config)
+        signatures = {path: watcher.signature(path) for path in paths} if watcher else None
+    
+    vector_index = None
+    if mode != "keyword":
+        vector_index = await run_io(get_vector_index, config)
+        if vector_index is None:
+            await ctx.warning("Semantic search needs NumPy (pip install memory-mcp-server[semantic]); falling back to keyword search")
+            mode = "keyword"
+    
+    limit = max(1, limit)
+    result_lists = []
+    summary: Dict[str, Any] = {}
+    store = await run_io(sync_memory_store, config) if mode != "semantic" else None
+    if store is not None:
+        result_lists.append(await run_io(store.search, query, limit if mode == "keyword" else limit * 3))
+        files_indexed, sections_indexed = await run_io(store.counts)
+        summary.update({
+            "sections_indexed": sections_indexed,
+            "files_indexed": files_indexed,
+            "backend": "sqlite"
+        })
+    elif mode != "semantic":
+        index = get_search_index(config)
+        reindexed = await run_io(index.refresh, paths, signatures)
+        if reindexed:
+            await ctx.debug(f"Reindexed {reindexed} memory files")
+            try:
+                await run_io(index.save)
+            except OSError as e:
+                await ctx.warning(f"Could not persist search index: {str(e)}")
+        result_lists.append(await run_io(index.search, query, limit if mode == "keyword" else limit * 3))
+        summary.update({
+            "sections_indexed": index.doc_count,
+            "files_indexed": len(index.files),
+            "files_reindexed": reindexed
+        })
+    if vector_index is not None:
+        embedded_before = vector_index.embedded
+        try:
+            reembedded = await run_io(vector_index.refresh, paths, signatures)
+        except OSError as e:
+            await ctx.warning(f"Could not persist vector index: {str(e)}")
+            reembedded = 0
+        result_lists.append(await run_io(vector_index.search, query, limit if mode == "semantic" else limit * 3))
+        summary.update({
+            "sections_embedded": vector_index.section_count,
+            "files_reembedded": reembedded,
+            "sections_recomputed": vector_index.embedded - embedded_before,
+            "embedder": vector_index.embedder.id
+        })
+    
+    if len(result_lists) > 1:
+        results = reciprocal_rank_fusion(result_lists, limit)
+    else:
+        results = result_lists[0][:limit]
+    
+    await ctx.info(f"Found {len(results)} matching sections")
+    
+    return {
+        "query": query,
+        "mode": mode,
+        "results": results,
+        "summary": {
+            "results_returned": len(results),
+            **summary
+        }
+    }
+
+@mcp.tool(description="Builds the session-start memory context within a token budget. Packs sections from known-issues.md, working-memory.md and project-knowledge.md in priority order (critical issues, current context, recent decisions, then remaining knowledge) and reports which sections were left out. Use at session start instead of loading every file.")
+@server_metrics.instrument
+async def build_session_context(ctx: Context, token_budget: int = 4000, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Assembles a fixed-size session context from the core memory files.
+    
+    Args:
+        ctx: The MCP context.
+        token_budget: Maximum estimated tokens of the returned context.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the packed context and the included and omitted sections.
+    """
+    await ctx.info(f"Building session context within {token_budget} tokens")
+    
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
+    
+    def read_session_file(file_name: str) -> Optional[Tuple[str, str]]:
+        match = resolve_memory_file(config, file_name)
+        if not match:
+            return None
+        _, content = file_cache.read(match[0])
+        return file_name, content
+    
+    files = []
+    for file_name, result in zip(SESSION_FILES, await asyncio.gather(*(run_io(read_session_file, name) for name in SESSION_FILES))):
+        if result:
+            files.append(result)
+        else:
+            await ctx.warning(f"Memory file not found: {file_name}")
+    
+    result = build_context(files, max(0, token_budget))
+    
+    await ctx.info(f"Packed {len(result['included'])} sections ({result['tokens_used']} tokens), omitted {len(result['omitted'])}")
+    
+    return {
+        "context": result["context"],
+        "included": result["included"],
+        "omitted": result["omitted"],
+        "summary": {
+            "token_budget": token_budget,
+            "tokens_used": result["tokens_used"],
+            "sections_included": len(result["included"]),
+            "sections_omitted": len(result["omitted"]),
+            "files_read": [file_name for file_name, _ in files]
+        }
+    }
+
+@mcp.tool(description="Garbage-collects a short-term memory file: moves timestamped entries older than max_age_days into compressed monthly segments under .cursor/memory/archive/ (searchable with search_archive) and merges exact and near-duplicate entries (entries differing only in timestamps or commit/hex ids), archiving the older copies, rewriting the file atomically. Repeat runs only scan entries appended since the last run.")
+@server_metrics.instrument
+async def compact_working_memory(ctx: Context, file_name: str = "working-memory.md", max_age_days: int = 30, dry_run: bool = False, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Archives expired entries and consolidates duplicates in a short-term memory file.
+    
+    Args:
+        ctx: The MCP context.
+        file_name: Short-term memory file to compact.
+        max_age_days: Entries older than this are archived.
+        dry_run: Report what would change without writing anything.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary summarizing archived and merged entries.
+    """
+    await ctx.info(f"Compacting {file_name} (max age {max_age_days} days)")
+    
+    config = await run_io(get_workspace_config, workspace)
+    file_path = get_memory_file_path(config, "short-term", file_name)
+    if not await run_io(os.path.exists, file_path):
+        await ctx.warning(f"Memory file not found: {file_name}")
+        return {"file_path": file_path, "compacted": False}
+    
+    compactor = get_compactor(config)
+    await memory_writer.flush()
+    
+    def compact() -> Dict[str, Any]:
+        # Hold back buffered appends while the file is rewritten
+        with memory_writer.exclusive(file_path):
+            result = compactor.compact(file_path, max_age_days, dry_run=dry_run)
+        if not dry_run:
+            compactor.save()
+            notify_memory_written(file_path)
+        return result
+    
+    result = await run_io(compact)
+    
+    await ctx.info(
+        f"Archived {result['archived']} entries, merged {result['exact_duplicates_merged']} exact "
+        f"and {result['near_duplicates_merged']} near duplicates"
+        + (" (incremental)" if result["incremental"] else "")
+    )
+    
+    return {
+        "file_path": file_path,
+        "compacted": True,
+        "dry_run": dry_run,
+        **result
+    }
+
+@mcp.tool(description="Searches archived memory entries (moved out of short-term memory by compact_working_memory into compressed segments under .cursor/memory/archive/). Returns the best matching entries with their ids; archived entries are never part of list_memory_files, load_memory_files or the session context.")
+@server_metrics.instrument
+async def search_archive(ctx: Context, query: str, limit: int = 5, file_name: Optional[str] = None, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Searches the compressed cold archive.
+    
+    Args:
+        ctx: The MCP context.
+        query: Free-text search query.
+        limit: Maximum number of entries to return.
+        file_name: Optional memory file the entries were archived from, e.g. working-memory.md.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the ranked archived entries.
+    """
+    await ctx.info(f"Searching archive for: {query}")
+    
+    config = await run_io(get_workspace_config, workspace)
+    archive = await run_io(get_archive, config)
+    results = await run_io(archive.search, query, max(1, limit), file_name)
+    stats = await run_io(archive.stats)
+    
+    await ctx.info(f"Found {len(results)} archived entries among {stats['entries']}")
+    
+    return {
+        "query": query,
+        "results": results,
+        "summary": {
+            "results_returned": len(results),
+            "entries_archived": stats["entries"],
+            "segments": stats["segments"],
+            "compressed_bytes": stats["compressed_bytes"]
+        }
+    }
+
+@mcp.tool(description="Loads archived memory entries by id (ids come from search_archive). Only the compressed blocks holding those entries are read.")
+@server_metrics.instrument
+async def load_archived_entries(ctx: Context, entry_ids: List[int], workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads entries from the compressed cold archive.
+    
+    Args:
+        ctx: The MCP context.
+        entry_ids: Ids of the archived entries to load.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the requested entries.
+    """
+    await ctx.info(f"Loading {len(entry_ids)} archived entries")
+    
+    config = await run_io(get_workspace_config, workspace)
+    archive = await run_io(get_archive, config)
+    entries = await run_io(archive.load, entry_ids)
+    missing = sorted(set(entry_ids) - {entry["id"] for entry in entries})
+    if missing:
+        await ctx.warning(f"Archived entries not found: {missing}")
+    
+    return {
+        "entries": entries,
+        "summary": {
+            "entries_loaded": len(entries),
+            "entries_missing": missing
+        }
+    }
+
+@mcp.tool(description="Returns recurring patterns from short-term memory that reached the promotion threshold (default: seen in 3+ entries), with their occurrence counts and example entries. Use this to decide what to promote to project-knowledge.md instead of re-reading working memory.")
+@server_metrics.instrument
+async def get_promotion_candidates(ctx: Context, threshold: int = 3, limit: int = 10, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Lists phrases that recur across working-memory entries.
+    
+    Args:
+        ctx: The MCP context.
+        threshold: Minimum number of entries a pattern must appear in.
+        limit: Maximum number of candidates to return.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing promotion candidates ordered by occurrence count.
+    """
+    await ctx.info(f"Looking for patterns seen {threshold}+ times")
+    
+    config = await run_io(get_workspace_config, workspace)
+    tracker = await run_io(get_pattern_tracker, config)
+    candidates = await run_io(tracker.candidates, max(1, threshold), max(1, limit))
+    
+    await ctx.info(f"Found {len(candidates)} promotion candidates across {len(tracker.entries)} tracked entries")
+    
+    return {
+        "candidates": candidates,
+        "summary": {
+            "threshold": threshold,
+            "candidates_returned": len(candidates),
+            "entries_tracked": len(tracker.entries),
+            "distinct_shingles": len(tracker.table)
+        }
+    }
+
+@mcp.tool(description="Loads a single section of a memory file by heading path (e.g. 'Recent Errors & Solutions' or 'Domain Knowledge > MCP Integration') without reading the rest of the file. Uses a persisted byte-offset index of headings, so the cost is proportional to the section, not the file. Set include_subsections=False to get only the text before the first nested heading.")
+@server_metrics.instrument
+async def load_memory_section(ctx: Context, file_name: str, heading_path: str, include_subsections: bool = True, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads one heading-delimited section of a memory file.
+    
+    Args:
+        ctx: The MCP context.
+        file_name: Memory file to read from.
+        heading_path: Heading, or headings joined with ' > ', matched case-insensitively against the end of each section's path.
+        include_subsections: Whether to include nested sections.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the section content and its location in the file.
+    """
+    await ctx.info(f"Loading section '{heading_path}' of {file_name}")
+    
+    config = await run_io(get_workspace_config, workspace)
+    resolved = await run_io(resolve_memory_file, config, file_name)
+    if not resolved:
+        await ctx.warning(f"Memory file not found: {file_name}")
+        return {"error": f"Memory file not found: {file_name}"}
+    file_path, category = resolved
+    await memory_writer.flush()
+    
+    try:
+        from .model import split_heading_path
+    except ImportError:
+        from memory_mcp_server.model import split_heading_path
+    store = get_model_store(config)
+    document, source = await run_io(store.document, file_path)
+    located = document.locate(split_heading_path(heading_path))
+    if located is None:
+        await ctx.warning(f"Section not found: {heading_path}")
+        return {
+            "error": f"Section not found: {heading_path}",
+            "file_name": file_name,
+            "available_sections": [" > ".join(path) for path, section in document.walk() if section.level <= 2][:50]
+        }
+    
+    path, node = located
+    end_byte = node.end_byte
+    if not include_subsections and node.children:
+        end_byte = node.children[0].start_byte
+    content = await run_io(read_range, file_path, node.start_byte, end_byte)
+    
+    await ctx.info(f"Loaded {end_byte - node.start_byte} of {document.size} bytes")
+    
+    return {
+        "file_name": file_name,
+        "file_path": file_path,
+        "category": category,
+        "heading": node.heading,
+        "heading_path": path,
+        "line": node.line,
+        "start_byte": node.start_byte,
+        "end_byte": end_byte,
+        "content": content,
+        "subsections": [child.heading for child in node.children],
+        "summary": {
+            "section_bytes": end_byte - node.start_byte,
+            "file_bytes": document.size,
+            "index_source": source
+        }
+    }
+
+@mcp.tool(description="Inserts or replaces the content of one section of a memory file in place, addressed by heading path (e.g. 'Recurring Patterns' or 'Domain Knowledge > MCP Integration'). mode='append' adds to the end of the section's own text; mode='replace' swaps its body. Missing headings are created under their closest existing parent. The file is rewritten atomically on the server and only the edited section is read, so promoting a pattern never requires sending the whole file.")
+@server_metrics.instrument
+async def upsert_memory_section(ctx: Context, file_name: str, heading_path: str, content: str, mode: str = "append", memory_type: str = "long-term", workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Appends to, replaces or creates a heading-addressed section of a memory file.
+    
+    Args:
+        ctx: The MCP context.
+        file_name: Memory file to edit. Created if it does not exist.
+        heading_path: Heading, or headings joined with ' > ', of the section to edit.
+        content: Markdown to append or to use as the new section body, without the heading.
+        mode: append or replace.
+        memory_type: Type of memory (short-term or long-term).
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary describing the edit and the resulting file size.
+    """
+    try:
+        from .model import UPSERT_MODES, plan_upsert, split_heading_path
+    except ImportError:
+        from memory_mcp_server.model import UPSERT_MODES, plan_upsert, split_heading_path
+    if mode not in UPSERT_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(UPSERT_MODES)}")
+    headings = split_heading_path(heading_path)
+    if not headings:
+        raise ValueError("heading_path must name at least one heading")
+    await ctx.info(f"Upserting section '{heading_path}' of {file_name} ({mode})")
+    
+    config = await run_io(get_workspace_config, workspace)
+    file_path = get_memory_file_path(config, memory_type, file_name)
+    store = get_model_store(config)
+    await memory_writer.flush()
+    
+    def upsert() -> Dict[str, Any]:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Hold back buffered appends while the file is rewritten
+        with memory_writer.exclusive(file_path):
+            if not os.path.exists(file_path):
+                with open(file_path, "a", encoding="utf-8"):
+                    pass
+            document, _ = store.document(file_path)
+            start, end, replacement, created = plan_upsert(
+                document, headings, content, mode, lambda first, last: read_range(file_path, first, last)
+            )
+            data = replacement.encode("utf-8")
+            size = splice_file(file_path, start, end, data)
+        store.forget(file_path)
+        notify_memory_written(file_path)
+        return {"created": created, "start_byte": start, "replaced_bytes": end - start, "written_bytes": len(data), "file_bytes": size}
+    
+    result = await run_io(upsert)
+    
+    await ctx.info(
+        f"{'Created' if result['created'] else 'Updated'} section '{heading_path}' "
+        f"({result['written_bytes']} bytes spliced into {result['file_bytes']})"
+    )
+    
+    return {
+        "file_path": file_path,
+        "heading_path": headings,
+        "mode": mode,
+        "created": result["created"],
+        "summary": {
+            "start_byte": result["start_byte"],
+            "replaced_bytes": result["replaced_bytes"],
+            "written_bytes": result["written_bytes"],
+            "file_bytes": result["file_bytes"]
+        }
+    }
+
+@mcp.tool(description="Runs a structured query over the parsed memory model instead of reading markdown. kind selects section, issue (known-issues.md records) or entry (timestamped working-memory entries); under keeps nodes below a heading path ('Parent > Child'); severity, status and component filter issue fields; since filters entries by timestamp; text matches headings. Examples: kind='issue', severity='Critical', status='Open'; under='Domain Knowledge'. Parse trees are cached on disk and only rebuilt when a file changes.")
+@server_metrics.instrument
+async def query_memory(
+    ctx: Context,
+    kind: Optional[str] = None,
+    file_name: Optional[str] = None,
+    under: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    component: Optional[str] = None,
+    since: Optional[str] = None,
+    text: Optional[str] = None,
+    include_content: bool = False,
+    limit: int = 20,
+    workspace: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Queries headings, issue records and entries of the memory files.
+    
+    Args:
+        ctx: The MCP context.
+        kind: Optional node kind: section, issue or entry.
+        file_name: Optional memory file to query. Defaults to every memory file.
+        under: Optional heading path; only nodes nested below it are returned.
+        severity: Optional issue severity, matched case-insensitively as a prefix.
+        status: Optional issue status, matched case-insensitively as a prefix.
+        component: Optional issue component, matched case-insensitively as a prefix.
+        since: Optional timestamp (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS); only later entries are returned.
+        text: Optional text that headings must contain.
+        include_content: Whether to return the text of each matching node.
+        limit: Maximum number of nodes to return.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the matching nodes with their heading paths and byte ranges.
+    """
+    try:
+        from .model import NODE_KINDS, TIMESTAMP_FORMAT, query_document, split_heading_path
+    except ImportError:
+        from memory_mcp_server.model import NODE_KINDS, TIMESTAMP_FORMAT, query_document, split_heading_path
+    if kind is not None and kind not in NODE_KINDS:
+        raise ValueError(f"kind must be one of: {', '.join(NODE_KINDS)}")
+    since_time = None
+    if since:
+        try:
+            since_time = datetime.strptime(since, TIMESTAMP_FORMAT if " " in since else "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("since must be formatted as YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+    await ctx.info(f"Querying memory model ({kind or 'all nodes'})")
+    
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
+    if file_name:
+        resolved = await run_io(resolve_memory_file, config, file_name)
+        if not resolved:
+            await ctx.warning(f"Memory file not found: {file_name}")
+            return {"error": f"Memory file not found: {file_name}", "results": []}
+        memory_files = [resolved]
+    else:
+        memory_files = await run_io(collect_memory_files, config)
+    
+    mirror = await run_io(sync_memory_store, config) if kind or since_time else None
+    if mirror is not None:
+        # Files the mirror holds no node of that kind (or no later entry) for cannot match
+        since_text = since_time.strftime(TIMESTAMP_FORMAT) if since_time else None
+        candidates = set(await run_io(mirror.paths_with, kind, since_text))
+        memory_files = [(path, category) for path, category in memory_files if path in candidates]
+    
+    store = get_model_store(config)
+    heading_path = split_heading_path(under) if under else None
+    
+    def run_query() -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        results: List[Dict[str, Any]] = []
+        sources = {"memory": 0, "sidecar": 0, "parsed": 0}
+        for path, _ in memory_files:
+            try:
+                document, source = store.document(path)
+            except OSError as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            sources[source] += 1
+            for result in query_document(document, kind, heading_path, severity, status, component, since_time, text):
+                result["file_name"] = os.path.basename(path)
+                if include_content:
+                    result["content"] = read_range(path, result["start_byte"], result["end_byte"])
+                results.append(result)
+                if len(results) >= limit:
+                    return results, sources
+        return results, sources
+    
+    limit = max(1, limit)
+    results, sources = await run_io(run_query)
+    
+    await ctx.info(f"Matched {len(results)} nodes in {len(memory_files)} files ({sources['parsed']} parsed)")
+    
+    return {
+        "results": results,
+        "summary": {
+            "results_returned": len(results),
+            "files_queried": len(memory_files),
+            "files_parsed": sources["parsed"],
+            "files_from_sidecar": sources["sidecar"],
+            "files_from_memory": sources["memory"]
+        }
+    }
+
+@mcp.tool(description="Matches an error message or stack trace against the records of known-issues.md and returns the closest issues with their severity, component, status and workaround. Stack frames, paths, line numbers and other volatile tokens are stripped before matching. Use this in the error flow instead of loading the whole known-issues registry.")
+@server_metrics.instrument
+async def match_known_issue(ctx: Context, error_text: str, limit: int = 3, min_score: float = 0.1, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Finds known issues that match an error.
+    
+    Args:
+        ctx: The MCP context.
+        error_text: The error message, optionally with its stack trace.
+        limit: Maximum number of matches to return.
+        min_score: Matches scoring below this (0 to 1) are left out.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary containing the normalized error signature and the best matching issues.
+    """
+    try:
+        from .issues import error_signature
+    except ImportError:
+        from memory_mcp_server.issues import error_signature
+    await ctx.info("Matching error against known issues")
+    
+    config = await run_io(get_workspace_config, workspace)
+    resolved = await run_io(resolve_memory_file, config, "known-issues.md")
+    if not resolved:
+        await ctx.warning("known-issues.md not found")
+        return {"error": "known-issues.md not found", "matches": []}
+    
+    file_path = resolved[0]
+    info, content = await run_io(file_cache.read, file_path)
+    matcher, cached = await run_io(get_known_issues(config).get, info.version, content)
+    matches = await run_io(matcher.match, error_text, max(1, limit), min_score)
+    
+    if matches:
+        await ctx.info(f"Best match: {matches[0]['id']} ({matches[0]['score']})")
+    else:
+        await ctx.info(f"No known issue matched among {len(matcher.issues)} records")
+    
+    return {
+        "file_path": file_path,
+        "error_signature": error_signature(error_text),
+        "matches": matches,
+        "summary": {
+            "issues_parsed": len(matcher.issues),
+            "matches_returned": len(matches),
+            "cached": cached,
+            "best_match": matches[0]["id"] if matches else None
+        }
+    }
+
+@mcp.tool(description="Returns counts for every memory file (size, lines, sections, entries per date, issues per severity and status, patterns and decisions) plus workspace totals, from a persisted manifest kept current on server writes and watched changes, without reading memory files. Use it to fill the session start banner ('X patterns, Y decisions loaded', 'Z active problems') instead of loading every file.")
+@server_metrics.instrument
+async def memory_stats(ctx: Context, include_files: bool = True, workspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns memory statistics from the workspace's stats manifest.
+    
+    Args:
+        ctx: The MCP context.
+        include_files: Whether to include the per-file records.
+        workspace: Optional workspace root. Defaults to CURSOR_MEMORY_BASE_PATH or the current directory.
+        
+    Returns:
+        A dictionary with per-file stats, per-category totals, the session banner and overall totals.
+    """
+    await ctx.info("Reading memory statistics")
+    
+    config = await run_io(get_workspace_config, workspace)
+    await memory_writer.flush()
+    manifest = await run_io(sync_stats_manifest, config)
+    summary = manifest.summary()
+    totals = summary["totals"]
+    long_term = summary["by_category"].get("long-term", {})
+    
+    files = []
+    if include_files:
+        for path, record in manifest.records():
+            files.append({
+                "path": path,
+                "name": os.path.basename(path),
+                "category": record["category"],
+                "size_bytes": record["size"],
+                "modified": datetime.fromtimestamp(record["mtime_ns"] / 1e9).isoformat(),
+                **{name: record[name] for name in (
+                    "line_count", "char_count", "sections", "entries", "entries_by_date",
+                    "issues", "issues_by_severity", "issues_by_status", "patterns", "decisions"
+                )}
+            })
+    
+    banner = (
+        f"- Long-term knowledge: {long_term.get('patterns', 0)} patterns, {long_term.get('decisions', 0)} decisions loaded\n"
+        f"- Known issues: {totals['active_issues']} active problems"
+    )
+    await ctx.info(f"Stats for {totals['files']} memory files ({manifest.files_read} re-counted, {manifest.tails_read} appends counted)")
+    
+    return {
+        "files": files,
+        "by_category": summary["by_category"],
+        "banner": banner,
+        "summary": {
+            "total_files": totals["files"],
+            "total_size_kb": round(totals["size"] / 1024, 2),
+            "total_lines": totals["line_count"],
+            "total_characters": totals["char_count"],
+            "sections": totals["sections"],
+            "entries": totals["entries"],
+            "entries_by_date": totals["entries_by_date"],
+            "issues": totals["issues"],
+            "issues_by_severity": totals["issues_by_severity"],
+            "issues_by_status": totals["issues_by_status"],
+            "active_issues": totals["active_issues"],
+            "patterns": totals["patterns"],
+            "decisions": totals["decisions"]
+        }
+    }
+
+@mcp.tool(description="Returns per-tool metrics collected since the server started: call and error counts, wall-time percentiles, time spent in filesystem work, bytes read from memory files and bytes returned, with histograms. Use format='prometheus' for the Prometheus text format.")
+@server_metrics.instrument
+async def get_server_metrics(ctx: Context, format: str = "json") -> Dict[str, Any]:
+    """
+    Reports the latency and payload metrics of every memory tool.
+    
+    Args:
+        ctx: The MCP context.
+        format: Either json or prometheus.
+        
+    Returns:
+        A dictionary containing per-tool metrics, or their Prometheus text rendering.
+    """
+    if format == "prometheus":
+        return {"format": "prometheus", "metrics": server_metrics.prometheus()}
+    if format != "json":
+        raise ValueError("format must be either json or prometheus")
+    
+    snapshot = server_metrics.snapshot()
+    slowest = max(snapshot["tools"].items(), key=lambda item: item[1]["wall_ms"]["mean"] or 0, default=(None, None))[0]
+    await ctx.info(f"Metrics for {len(snapshot['tools'])} tools" + (f", slowest on average: {slowest}" if slowest else ""))
+    
+    return {
+        "format": "json",
+        "tools": snapshot["tools"],
+        "file_cache": file_cache.stats(),
+        "summary": {
+            "uptime_seconds": snapshot["uptime_seconds"],
+            "tools_called": len(snapshot["tools"]),
+            "total_calls": sum(tool["calls"] for tool in snapshot["tools"].values()),
+            "slowest_tool": slowest,
+            "workspaces_loaded": len(workspaces)
+        }
+    }
+
+def daemon_health() -> Dict[str, Any]:
+    """Server state reported by the daemon health endpoint."""
+    return {
+        "workspaces": [state.config.base_path for state in workspaces.values()],
+        "workspace_evictions": workspaces.evictions,
+        "file_cache": file_cache.stats()
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    try:
+        from . import daemon
+    except ImportError:
+        from memory_mcp_server import daemon
+    parser = argparse.ArgumentParser(prog="memory-mcp-server", description="Memory MCP server for Cursor's intelligent memory system.")
+    parser.add_argument("--transport", choices=daemon.TRANSPORTS, default=os.environ.get('CURSOR_MEMORY_TRANSPORT', 'stdio'),
+                        help="stdio (default) or a persistent HTTP daemon shared by several clients")
+    parser.add_argument("--host", default=os.environ.get('CURSOR_MEMORY_HOST', daemon.DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.environ.get('CURSOR_MEMORY_PORT', daemon.DEFAULT_PORT)))
+    parser.add_argument("--max-concurrency", type=int, default=int(os.environ.get('CURSOR_MEMORY_MAX_CONCURRENCY', daemon.DEFAULT_MAX_CONCURRENCY)),
+                        help="HTTP requests processed at once")
+    parser.add_argument("--max-queue", type=int, default=int(os.environ.get('CURSOR_MEMORY_MAX_QUEUE', daemon.DEFAULT_MAX_QUEUE)),
+                        help="HTTP requests waiting for a slot before new ones get 503")
+    return parser.parse_args(argv)
+
 def main():
     """Main entry point for the Memory MCP server."""
-    mcp.run()
+    try:
+        from . import daemon
+    except ImportError:
+        from memory_mcp_server import daemon
+    args = parse_args()
+    global watch_workspaces, memory_backend
+    watch_workspaces = True
+    if memory_backend not in MEMORY_BACKENDS:
+        logger.warning(f"Unknown CURSOR_MEMORY_BACKEND {memory_backend!r}, using files")
+        memory_backend = "files"
+    elif memory_backend == "sqlite":
+        try:
+            from .store import available as sqlite_store_available
+        except ImportError:
+            from memory_mcp_server.store import available as sqlite_store_available
+        if not sqlite_store_available():
+            logger.warning("This Python's SQLite has no FTS5 support, using the files backend")
+            memory_backend = "files"
+    # Warm up the default workspace off the startup path; others are opened by the first tool call naming them
+    io_executor.submit(get_workspace, get_memory_config())
+    try:
+        if args.transport == "stdio":
+            mcp.run()
+        else:
+            daemon.serve(
+                mcp,
+                args.transport,
+                host=args.host,
+                port=args.port,
+                max_concurrency=args.max_concurrency,
+                max_queue=args.max_queue,
+                health_info=daemon_health
+            )
+    finally:
+        for state in workspaces.values():
+            if state.watcher:
+                state.watcher.stop()
+            if state.store:
+                state.store.close()
+        if server_metrics.export_path and server_metrics.export_format == "prometheus":
+            server_metrics.write_prometheus()
+        # Persist any memory entries still waiting in the write-behind buffer
+        written = memory_writer.flush_sync()
+        if written:
+            logger.info(f"Flushed {written} bytes of pending memory writes on shutdown")
 
 if __name__ == "__main__":
     main() 
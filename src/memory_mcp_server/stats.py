@@ -0,0 +1,312 @@
+"""Persisted per-file statistics of memory files, kept current incrementally."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .model import FENCE_RE, parse_document
+    from .writer import atomic_write
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.model import FENCE_RE, parse_document
+    from memory_mcp_server.writer import atomic_write
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+STATS_VERSION = 2
+# Bytes before the old end of file that must be unchanged for growth to count as an append
+FINGERPRINT_BYTES = 64
+
+# Issues in any other status count as active problems
+CLOSED_STATUSES = ("resolved", "fixed", "closed", "done", "won't fix", "wont fix")
+PATTERN_RE = re.compile(r"pattern", re.IGNORECASE)
+DECISION_RE = re.compile(r"decision", re.IGNORECASE)
+# Top-level "- " / "* " items; the setup template records patterns and decisions as bullets
+LIST_ITEM_RE = re.compile(rb"^[-*][ \t]")
+# An appended tail that opens with a "## " heading parses the same on its own as inside the file
+TAIL_START_RE = re.compile(rb"^\s*##[ \t]")
+LINE_BREAKS = ("\n", "\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+
+COUNTERS = ("files", "size", "line_count", "char_count", "sections", "entries", "issues", "patterns", "decisions")
+BREAKDOWNS = ("entries_by_date", "issues_by_severity", "issues_by_status")
+
+Signature = Tuple[int, int]
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.blake2b(data[-FINGERPRINT_BYTES:], digest_size=8).hexdigest()
+
+
+def empty_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = {name: 0 for name in COUNTERS}
+    totals.update({name: {} for name in BREAKDOWNS})
+    return totals
+
+
+def count_list_items(data: bytes) -> int:
+    """Counts top-level list items of ``data`` outside code fences."""
+    count = 0
+    in_fence = False
+    for line in data.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and LIST_ITEM_RE.match(line):
+            count += 1
+    return count
+
+
+def count_content(data: bytes, content: str) -> Dict[str, Any]:
+    """
+    Counts lines, characters and parse-tree nodes of ``data``.
+
+    Patterns and decisions are the top-level list items in the own text of a
+    heading that mentions them (e.g. "## Recurring Patterns", "## Session
+    Decisions"), plus the nodes nested directly under such a heading.
+    """
+    counts = {
+        "line_count": len(content.splitlines()),
+        "char_count": len(content),
+        "ends_with_break": content.endswith(LINE_BREAKS),
+        "open_fence": sum(1 for line in data.splitlines() if FENCE_RE.match(line)) % 2 == 1,
+        "fingerprint": fingerprint(data),
+        "sections": 0,
+        "entries": 0,
+        "issues": 0,
+        "patterns": 0,
+        "decisions": 0,
+        "entries_by_date": {},
+        "issues_by_severity": {},
+        "issues_by_status": {},
+    }
+    document = parse_document("", data, 0, len(data), "")
+    for heading_path, node in document.walk():
+        counts["sections"] += 1
+        parent = heading_path[-2] if len(heading_path) > 1 else ""
+        if PATTERN_RE.search(parent):
+            counts["patterns"] += 1
+        if DECISION_RE.search(parent):
+            counts["decisions"] += 1
+        if PATTERN_RE.search(node.heading) or DECISION_RE.search(node.heading):
+            text_end = node.children[0].start_byte if node.children else node.end_byte
+            items = count_list_items(data[node.body_byte:text_end])
+            if PATTERN_RE.search(node.heading):
+                counts["patterns"] += items
+            if DECISION_RE.search(node.heading):
+                counts["decisions"] += items
+        if node.kind == "entry":
+            date = node.timestamp[:10]
+            counts["entries"] += 1
+            counts["entries_by_date"][date] = counts["entries_by_date"].get(date, 0) + 1
+        elif node.kind == "issue":
+            counts["issues"] += 1
+            for field, breakdown in (("severity", "issues_by_severity"), ("status", "issues_by_status")):
+                value = node.fields.get(field, "").strip().lower() or "unknown"
+                counts[breakdown][value] = counts[breakdown].get(value, 0) + 1
+    return counts
+
+
+def _accumulate(totals: Dict[str, Any], record: Dict[str, Any], sign: int) -> None:
+    """Adds (sign 1) or removes (sign -1) a file record's counts from ``totals``."""
+    totals["files"] += sign
+    for name in COUNTERS[1:]:
+        totals[name] += sign * record[name]
+    for name in BREAKDOWNS:
+        breakdown = totals[name]
+        for key, count in record[name].items():
+            value = breakdown.get(key, 0) + sign * count
+            if value:
+                breakdown[key] = value
+            else:
+                breakdown.pop(key, None)
+
+
+class StatsManifest:
+    """
+    Size, line, section, issue and entry counts of every memory file.
+
+    Records are persisted in one JSON manifest, keyed on the stat signature
+    they were counted from, and per-category totals are adjusted by the
+    difference whenever a record changes, so reading them costs nothing.
+    A file that grew while its last ``FINGERPRINT_BYTES`` stayed in place is
+    taken as appended to and updated from the new bytes alone, provided they
+    start with a ``## `` heading outside a code fence (as memory_update
+    entries do); any other change re-counts the file.
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.totals: Dict[str, Dict[str, Any]] = {}
+        self.reconciled = False
+        self.files_read = 0
+        self.tails_read = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable stats manifest {self.manifest_path}: {e}")
+            return
+        if not isinstance(data, dict) or data.get("version") != STATS_VERSION:
+            return
+        try:
+            for path, record in data.get("files", {}).items():
+                self._set(path, record)
+        except (KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring malformed stats manifest {self.manifest_path}: {e}")
+            self.files, self.totals = {}, {}
+
+    def save(self) -> None:
+        # Held while writing so an older snapshot can never replace a newer one
+        with self._lock:
+            data = json.dumps({"version": STATS_VERSION, "files": self.files}, ensure_ascii=False, separators=(",", ":"))
+            try:
+                atomic_write(self.manifest_path, data)
+            except OSError as e:
+                logger.warning(f"Could not write stats manifest {self.manifest_path}: {e}")
+
+    def _set(self, path: str, record: Optional[Dict[str, Any]]) -> None:
+        previous = self.files.pop(path, None)
+        if previous is not None:
+            _accumulate(self.totals[previous["category"]], previous, -1)
+        if record is not None:
+            self.files[path] = record
+            _accumulate(self.totals.setdefault(record["category"], empty_totals()), record, 1)
+
+    def refresh(self, path: str, category: str, signature: Optional[Signature] = None) -> bool:
+        """
+        Brings the record of ``path`` up to date.
+
+        Returns:
+            Whether the record changed (and the manifest was saved).
+        """
+        with self._lock:
+            changed = self._refresh(path, category, signature)
+            if changed:
+                self.save()
+        return changed
+
+    def reconcile(self, files: List[Tuple[str, str, Optional[Signature]]]) -> int:
+        """
+        Brings the manifest in line with ``files`` ((path, category, stat signature or None)).
+
+        Returns:
+            The number of records that were updated or dropped.
+        """
+        with self._lock:
+            wanted = {path for path, _, _ in files}
+            changed = 0
+            for path in [path for path in self.files if path not in wanted]:
+                self._set(path, None)
+                changed += 1
+            for path, category, signature in files:
+                changed += int(self._refresh(path, category, signature))
+            self.reconciled = True
+            if changed:
+                self.save()
+        return changed
+
+    def _refresh(self, path: str, category: str, signature: Optional[Signature]) -> bool:
+        if signature is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if path not in self.files:
+                    return False
+                self._set(path, None)
+                return True
+            signature = (stat.st_mtime_ns, stat.st_size)
+        record = self.files.get(path)
+        if record and record["category"] == category and (record["mtime_ns"], record["size"]) == tuple(signature):
+            return False
+
+        try:
+            if record and record["category"] == category and 0 < record["size"] < signature[1] and not record["open_fence"]:
+                if self._extend(path, record):
+                    return True
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                data = f.read()
+            record_bytes_read(len(data))
+            counts = count_content(data, data.decode("utf-8"))
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Dropping stats of {path}: {e}")
+            self._set(path, None)
+            return record is not None
+        self.files_read += 1
+        self._set(path, {"category": category, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, **counts})
+        return True
+
+    def _extend(self, path: str, record: Dict[str, Any]) -> bool:
+        """Adds the counts of the bytes appended after ``record`` was taken; False if they must be re-counted."""
+        start = max(0, record["size"] - FINGERPRINT_BYTES)
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            f.seek(start)
+            data = f.read()
+        record_bytes_read(len(data))
+        known, data = data[:record["size"] - start], data[record["size"] - start:]
+        if stat.st_size != start + len(known) + len(data) or fingerprint(known) != record["fingerprint"]:
+            return False
+        if not TAIL_START_RE.match(data):
+            return False
+        tail = count_content(data, data.decode("utf-8"))
+
+        updated = dict(record, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        # A tail that starts mid-line continues the file's last line
+        joined = 1 if record["line_count"] and not record["ends_with_break"] and tail["line_count"] else 0
+        updated["line_count"] = record["line_count"] + tail["line_count"] - joined
+        updated["char_count"] = record["char_count"] + tail["char_count"]
+        updated["ends_with_break"] = tail["ends_with_break"]
+        updated["open_fence"] = tail["open_fence"]
+        updated["fingerprint"] = fingerprint(known + data)
+        for name in COUNTERS[4:]:
+            updated[name] = record[name] + tail[name]
+        for name in BREAKDOWNS:
+            merged = dict(record[name])
+            for key, count in tail[name].items():
+                merged[key] = merged.get(key, 0) + count
+            updated[name] = merged
+        self.tails_read += 1
+        self._set(path, updated)
+        return True
+
+    def file_stats(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self.files.get(path)
+            return dict(record) if record else None
+
+    def records(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Returns (path, record) for every file, ordered by path."""
+        with self._lock:
+            return [(path, dict(record)) for path, record in sorted(self.files.items())]
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per category and overall, plus the active problem count, from the running totals."""
+        with self._lock:
+            by_category = {
+                category: {**totals, **{name: dict(totals[name]) for name in BREAKDOWNS}}
+                for category, totals in self.totals.items() if totals["files"]
+            }
+        overall = empty_totals()
+        for totals in by_category.values():
+            for name in COUNTERS:
+                overall[name] += totals[name]
+            for name in BREAKDOWNS:
+                for key, count in totals[name].items():
+                    overall[name][key] = overall[name].get(key, 0) + count
+        overall["active_issues"] = sum(
+            count for status, count in overall["issues_by_status"].items() if status not in CLOSED_STATUSES
+        )
+        return {"totals": overall, "by_category": by_category}
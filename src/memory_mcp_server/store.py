@@ -0,0 +1,287 @@
+"""Optional SQLite mirror of memory files, with a full-text index of their sections."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .cache import content_version
+    from .model import parse_document
+    from .search import tokenize
+    from .metrics import record_bytes_read
+except ImportError:
+    from memory_mcp_server.cache import content_version
+    from memory_mcp_server.model import parse_document
+    from memory_mcp_server.search import tokenize
+    from memory_mcp_server.metrics import record_bytes_read
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+BUSY_TIMEOUT_MS = 5000
+
+# Lookup order of resolve(), same as for the markdown directories
+CATEGORY_ORDER = ("short-term", "long-term", "rules")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    char_count INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    heading_path TEXT NOT NULL, -- JSON array of headings, root first
+    level INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    start_byte INTEGER NOT NULL,
+    text_end INTEGER NOT NULL,
+    end_byte INTEGER NOT NULL,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS sections_path ON sections (path);
+CREATE INDEX IF NOT EXISTS sections_timestamp ON sections (timestamp) WHERE timestamp IS NOT NULL;
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5 (heading, body, tokenize = 'porter unicode61');
+"""
+
+FILE_COLUMNS = "path, name, category, mtime_ns, size, line_count, char_count, version"
+
+Signature = Tuple[int, int]
+
+
+def available() -> bool:
+    """Whether this Python's SQLite was built with FTS5."""
+    try:
+        connection = sqlite3.connect(":memory:")
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5 (text)")
+        finally:
+            connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class SqliteMemoryStore:
+    """
+    Memory files mirrored into one SQLite database per workspace.
+
+    ``files`` holds each file's content, counts and version token keyed on
+    its stat signature; ``sections`` holds every node of its parse tree
+    (sections, issues and timestamped entries) with byte offsets; and
+    ``sections_fts`` is an FTS5 index of their headings and own text (up to
+    ``text_end``, the first child) whose rowids are section ids; ``search``
+    ranks it with FTS5's BM25. The database runs in WAL mode so several
+    server processes can read while one of them refreshes it. The markdown
+    files remain the source of truth: ``sync`` re-reads only files whose
+    signature differs from the stored one, so listings, loads and searches
+    are indexed queries.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                # The database is only a mirror, so an old layout is rebuilt from the files
+                logger.info(f"Rebuilding {self.db_path} (schema {version} -> {SCHEMA_VERSION})")
+                for table in ("sections_fts", "sections", "files"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    def sync(self, files: List[Tuple[str, str, Optional[Signature]]]) -> int:
+        """
+        Brings the mirror in line with ``files`` ((path, category, stat signature or None)).
+
+        Returns:
+            The number of files that were (re)mirrored or dropped.
+        """
+        with self._lock:
+            stored = {
+                row["path"]: (row["mtime_ns"], row["size"], row["category"])
+                for row in self.connection.execute("SELECT path, mtime_ns, size, category FROM files")
+            }
+            wanted = {path for path, _, _ in files}
+            stale = [path for path in stored if path not in wanted]
+            changed: List[Tuple[str, str]] = []
+            for path, category, signature in files:
+                if signature is None:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        if path in stored:
+                            stale.append(path)
+                        continue
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                if stored.get(path) != (signature[0], signature[1], category):
+                    changed.append((path, category))
+            if not stale and not changed:
+                return 0
+
+            # Files are read before the write transaction so readers in other processes are not held up
+            documents = []
+            for path, category in changed:
+                try:
+                    with open(path, "rb") as f:
+                        stat = os.fstat(f.fileno())
+                        data = f.read()
+                    record_bytes_read(len(data))
+                    content = data.decode("utf-8")
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Skipping {path} while mirroring: {e}")
+                    stale.append(path)
+                    continue
+                documents.append((path, category, stat, data, content))
+
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                for path in stale + [path for path, _, _, _, _ in documents]:
+                    self._delete(path)
+                for path, category, stat, data, content in documents:
+                    self._insert(path, category, stat, data, content)
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            return len(stale) + len(documents)
+
+    def _delete(self, path: str) -> None:
+        self.connection.execute("DELETE FROM sections_fts WHERE rowid IN (SELECT id FROM sections WHERE path = ?)", (path,))
+        self.connection.execute("DELETE FROM sections WHERE path = ?", (path,))
+        self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _insert(self, path: str, category: str, stat: os.stat_result, data: bytes, content: str) -> None:
+        version = content_version(content)
+        self.connection.execute(
+            f"INSERT INTO files ({FILE_COLUMNS}, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, os.path.basename(path), category, stat.st_mtime_ns, stat.st_size,
+             len(content.splitlines()), len(content), version, content)
+        )
+        document = parse_document(path, data, stat.st_mtime_ns, stat.st_size, version)
+        for heading_path, node in document.walk():
+            # Each node's own text, up to its first child, so nested text is indexed once
+            text_end = node.children[0].start_byte if node.children else node.end_byte
+            cursor = self.connection.execute(
+                "INSERT INTO sections (path, kind, heading, heading_path, level, line, start_byte, text_end, end_byte, timestamp)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, node.kind, node.heading, json.dumps(heading_path, ensure_ascii=False), node.level, node.line,
+                 node.start_byte, text_end, node.end_byte, getattr(node, "timestamp", None))
+            )
+            self.connection.execute(
+                "INSERT INTO sections_fts (rowid, heading, body) VALUES (?, ?, ?)",
+                (cursor.lastrowid, node.heading, data[node.body_byte:text_end].decode("utf-8", errors="replace"))
+            )
+
+    def list_files(self) -> List[Dict[str, Any]]:
+        """Returns the metadata of every mirrored file, ordered by path."""
+        with self._lock:
+            rows = self.connection.execute(f"SELECT {FILE_COLUMNS} FROM files ORDER BY path").fetchall()
+        return [dict(row) for row in rows]
+
+    def resolve(self, file_names: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Maps each mirrored file name to its (path, category), preferring short-term over long-term over rules."""
+        if not file_names:
+            return {}
+        placeholders = ", ".join("?" * len(file_names))
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT name, path, category FROM files WHERE name IN ({placeholders})", list(file_names)
+            ).fetchall()
+        rank = {category: index for index, category in enumerate(CATEGORY_ORDER)}
+        resolved: Dict[str, Tuple[str, str]] = {}
+        for row in sorted(rows, key=lambda row: rank.get(row["category"], len(rank))):
+            resolved.setdefault(row["name"], (row["path"], row["category"]))
+        return resolved
+
+    def read(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns metadata and content of the given mirrored files, keyed by path."""
+        if not paths:
+            return {}
+        placeholders = ", ".join("?" * len(paths))
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT {FILE_COLUMNS}, content FROM files WHERE path IN ({placeholders})", list(paths)
+            ).fetchall()
+        return {row["path"]: dict(row) for row in rows}
+
+    def counts(self) -> Tuple[int, int]:
+        """Returns the number of mirrored files and sections."""
+        with self._lock:
+            files = self.connection.execute("SELECT count(*) FROM files").fetchone()[0]
+            sections = self.connection.execute("SELECT count(*) FROM sections").fetchone()[0]
+        return files, sections
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranks sections against ``query`` with the FTS5 index and returns the top ``limit`` hits.
+
+        Any query word may match, as with ``SearchIndex.search``; results have
+        the same keys, with each section's own text as ``content``.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        expression = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT s.path, s.heading, s.heading_path, s.line, sections_fts.rank AS rank,"
+                " substr(CAST(f.content AS BLOB), s.start_byte + 1, s.text_end - s.start_byte) AS text"
+                " FROM sections_fts JOIN sections s ON s.id = sections_fts.rowid JOIN files f ON f.path = s.path"
+                " WHERE sections_fts MATCH ? ORDER BY sections_fts.rank LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+        return [{
+            "path": row["path"],
+            "file_name": os.path.basename(row["path"]),
+            "heading": row["heading"],
+            "heading_path": json.loads(row["heading_path"]),
+            "line": row["line"],
+            # FTS5 ranks by negated BM25, lower is better
+            "score": round(-row["rank"], 4),
+            "content": bytes(row["text"]).decode("utf-8", errors="replace"),
+        } for row in rows]
+
+    def paths_with(self, kind: Optional[str] = None, since: Optional[str] = None) -> List[str]:
+        """
+        Returns the mirrored files holding at least one node of ``kind``, or
+        one entry timestamped at or after ``since`` (YYYY-MM-DD HH:MM:SS).
+        """
+        clauses, parameters = [], []
+        if kind:
+            clauses.append("kind = ?")
+            parameters.append(kind)
+        if since:
+            clauses.append("timestamp >= ?")
+            parameters.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.connection.execute(f"SELECT DISTINCT path FROM sections{where}", parameters).fetchall()
+        return [row["path"] for row in rows]
@@ -0,0 +1,306 @@
+"""Filesystem watcher keeping an in-memory snapshot of the memory directories."""
+
+import fnmatch
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from stat import S_ISREG
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+Signature = Tuple[int, int]
+
+
+class MemoryWatcher:
+    """
+    Keeps ``{directory: {file name: (st_mtime_ns, st_size)}}`` for a set of
+    directories up to date without per-request stat or glob calls.
+
+    On Linux it uses inotify (through libc, no extra dependency) and also
+    watches the ancestors of the memory directories so they are picked up when
+    created later. Elsewhere, or when inotify is unavailable, a polling thread
+    re-lists a directory only when its mtime changes and re-stats the known
+    files to catch in-place edits. ``on_change`` is called with the path of
+    every file whose signature changed or that disappeared.
+    """
+
+    def __init__(
+        self,
+        directories: List[str],
+        root: str,
+        on_change: Optional[Callable[[str], None]] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        backend: str = "auto",
+    ):
+        self.directories = [os.path.normpath(directory) for directory in directories]
+        self.root = os.path.normpath(root)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.requested_backend = backend
+        self.backend: Optional[str] = None
+        self.snapshot: Dict[str, Dict[str, Signature]] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify_fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        self._libc = None
+        self._get_errno: Optional[Callable[[], int]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _watched_paths(self) -> List[str]:
+        """Memory directories plus every ancestor below the workspace root."""
+        paths = set(self.directories)
+        for directory in self.directories:
+            parent = os.path.dirname(directory)
+            while parent.startswith(self.root) and parent not in paths:
+                paths.add(parent)
+                if parent == self.root:
+                    break
+                parent = os.path.dirname(parent)
+        return sorted(paths)
+
+    def start(self) -> None:
+        """Takes the initial snapshot and starts the background thread."""
+        for directory in self.directories:
+            self.rescan_directory(directory, notify=False)
+        if self.requested_backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self._init_inotify()
+                self.backend = "inotify"
+            except OSError as e:
+                logger.warning(f"inotify unavailable ({e}), falling back to polling")
+        if self.backend is None:
+            self.backend = "polling"
+        target = self._inotify_loop if self.backend == "inotify" else self._poll_loop
+        self._thread = threading.Thread(target=target, name="memory-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching memory directories with {self.backend}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    # Snapshot queries
+
+    def exists(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        with self._lock:
+            if path in self.snapshot:
+                return True
+            entries = self.snapshot.get(os.path.dirname(path))
+            return entries is not None and os.path.basename(path) in entries
+
+    def files(self, directory: str, pattern: str) -> List[Tuple[str, int, int]]:
+        """Returns (path, mtime_ns, size) for snapshot files in ``directory`` matching ``pattern``."""
+        directory = os.path.normpath(directory)
+        with self._lock:
+            entries = dict(self.snapshot.get(directory, {}))
+        return [
+            (os.path.join(directory, name), mtime_ns, size)
+            for name, (mtime_ns, size) in entries.items()
+            if fnmatch.fnmatch(name, pattern)
+        ]
+
+    def signature(self, path: str) -> Optional[Signature]:
+        path = os.path.normpath(path)
+        with self._lock:
+            return self.snapshot.get(os.path.dirname(path), {}).get(os.path.basename(path))
+
+    # Snapshot maintenance
+
+    def rescan_directory(self, directory: str, notify: bool = True) -> None:
+        """Re-lists one memory directory and reports files that changed."""
+        if directory not in self.directories:
+            return
+        entries: Optional[Dict[str, Signature]] = {}
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            self._dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+        except OSError:
+            entries = None
+            self._dir_mtimes.pop(directory, None)
+
+        with self._lock:
+            previous = self.snapshot.get(directory, {})
+            if entries is None:
+                self.snapshot.pop(directory, None)
+                entries = {}
+            else:
+                self.snapshot[directory] = entries
+        if notify:
+            for name in set(previous) | set(entries):
+                if previous.get(name) != entries.get(name):
+                    self._notify(os.path.join(directory, name))
+
+    def refresh_path(self, path: str) -> None:
+        """Re-stats a single file, e.g. right after the server wrote it."""
+        path = os.path.normpath(path)
+        directory = os.path.dirname(path)
+        if directory not in self.directories:
+            return
+        with self._lock:
+            known = directory in self.snapshot
+        if not known:
+            self.rescan_directory(directory)
+            return
+        try:
+            stat = os.stat(path)
+            signature: Optional[Signature] = (stat.st_mtime_ns, stat.st_size) if S_ISREG(stat.st_mode) else None
+        except OSError:
+            signature = None
+        with self._lock:
+            entries = self.snapshot.setdefault(directory, {})
+            previous = entries.get(os.path.basename(path))
+            if signature is None:
+                entries.pop(os.path.basename(path), None)
+            else:
+                entries[os.path.basename(path)] = signature
+        if previous != signature:
+            self._notify(path)
+
+    def _notify(self, path: str) -> None:
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(path)
+        except Exception as e:
+            logger.error(f"Watcher callback failed for {path}: {e}")
+
+    # Polling backend
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            for directory in self.directories:
+                try:
+                    mtime_ns: Optional[int] = os.stat(directory).st_mtime_ns
+                except OSError:
+                    mtime_ns = None
+                if mtime_ns != self._dir_mtimes.get(directory):
+                    self.rescan_directory(directory)
+                    continue
+                # Directory mtimes miss in-place edits, so re-stat known files
+                with self._lock:
+                    names = list(self.snapshot.get(directory, {}))
+                for name in names:
+                    self.refresh_path(os.path.join(directory, name))
+
+    # inotify backend
+
+    def _init_inotify(self) -> None:
+        # Imported here so servers that never watch skip loading ctypes
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._libc = libc
+        self._get_errno = ctypes.get_errno
+        self._inotify_fd = fd
+        self._add_watches()
+
+    def _add_watches(self) -> None:
+        watched = set(self._watches.values())
+        for path in self._watched_paths():
+            if path in watched or not os.path.isdir(path):
+                continue
+            wd = self._libc.inotify_add_watch(self._inotify_fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                errno = self._get_errno()
+                raise OSError(errno, f"inotify_add_watch({path}): {os.strerror(errno)}")
+            self._watches[wd] = path
+
+    def _inotify_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self._inotify_fd], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                data = os.read(self._inotify_fd, 64 * 1024)
+            except (OSError, ValueError, TypeError):
+                if self._stop.is_set():
+                    return
+                raise
+            self._handle_events(data)
+
+    def _directories_under(self, ancestor: str) -> List[str]:
+        return [
+            directory for directory in self.directories
+            if directory == ancestor or directory.startswith(ancestor + os.sep)
+        ]
+
+    def _handle_events(self, data: bytes) -> None:
+        dirty_dirs = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                dirty_dirs.update(self.directories)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                dirty_dirs.update(self._directories_under(directory))
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if directory in self.directories:
+                self.refresh_path(path)
+            else:
+                # Something appeared or vanished above the memory directories
+                dirty_dirs.update(self._directories_under(path))
+
+        if dirty_dirs:
+            try:
+                self._add_watches()
+            except OSError as e:
+                logger.warning(f"Could not extend inotify watches: {e}")
+            for directory in dirty_dirs:
+                self.rescan_directory(directory)
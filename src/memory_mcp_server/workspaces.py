@@ -0,0 +1,84 @@
+"""LRU registry of per-workspace server state."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKSPACES = 16
+
+T = TypeVar("T")
+
+
+class WorkspaceRegistry(Generic[T]):
+    """
+    Holds the state of at most ``max_workspaces`` workspaces, keyed by base path.
+
+    State is created on first use with ``factory`` and the least recently used
+    workspace is evicted once the limit is exceeded; ``on_evict`` receives the
+    evicted state so it can release watchers and cached contents. Everything a
+    workspace keeps is rebuilt from disk on its next use.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], T],
+        max_workspaces: int = DEFAULT_MAX_WORKSPACES,
+        on_evict: Optional[Callable[[T], None]] = None,
+    ):
+        self.factory = factory
+        self.max_workspaces = max(1, max_workspaces)
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._states: "OrderedDict[str, T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, base_path: str) -> T:
+        """Returns the state of ``base_path``, creating it and evicting idle workspaces as needed."""
+        evicted: List[T] = []
+        with self._lock:
+            state = self._states.get(base_path)
+            if state is not None:
+                self._states.move_to_end(base_path)
+                return state
+            state = self.factory(base_path)
+            self._states[base_path] = state
+            while len(self._states) > self.max_workspaces:
+                old_path, old_state = self._states.popitem(last=False)
+                logger.info(f"Evicting idle workspace {old_path}")
+                evicted.append(old_state)
+                self.evictions += 1
+        for old_state in evicted:
+            self._evict(old_state)
+        return state
+
+    def peek(self, base_path: str) -> Optional[T]:
+        """Returns the state of ``base_path`` if loaded, without touching its LRU position."""
+        with self._lock:
+            return self._states.get(base_path)
+
+    def values(self) -> List[T]:
+        with self._lock:
+            return list(self._states.values())
+
+    def clear(self) -> None:
+        """Evicts every workspace, e.g. on shutdown."""
+        with self._lock:
+            states = list(self._states.values())
+            self._states.clear()
+        for state in states:
+            self._evict(state)
+
+    def _evict(self, state: T) -> None:
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(state)
+        except Exception as e:
+            logger.error(f"Failed to release workspace state: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
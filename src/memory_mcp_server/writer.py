@@ -0,0 +1,326 @@
+"""Server-side append path for memory files."""
+
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on this platform; in-process locks still apply
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.25
+DEFAULT_MAX_PENDING_BYTES = 1024 * 1024
+
+ENTRY_SEPARATOR = "\n\n"
+COPY_CHUNK_BYTES = 1024 * 1024
+# Held exclusively by anything that writes the markdown files of a directory
+FILES_LOCK_NAME = ".memory.lock"
+
+
+@contextmanager
+def flocked(lock_path: str, exclusive: bool = True, blocking: bool = True) -> Iterator[bool]:
+    """
+    Holds an advisory ``flock`` on ``lock_path``, creating the file if needed.
+
+    Yields whether the lock was acquired; only ``blocking=False`` can yield
+    False. Without ``fcntl`` (Windows) the lock is a no-op that always succeeds.
+    """
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        flags = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(fd, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def files_lock(path: str, blocking: bool = True):
+    """Exclusive lock over the markdown files in the directory of ``path``."""
+    return flocked(os.path.join(os.path.dirname(path), FILES_LOCK_NAME), blocking=blocking)
+
+
+def append_entries(path: str, entries: List[str]) -> int:
+    """
+    Appends entries to ``path`` with a single O_APPEND write and one fsync.
+
+    Entries are separated from each other, and from existing content, by a
+    blank line. Missing parent directories are created.
+
+    Returns:
+        The number of bytes written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        prefix = ""
+        if size > 0:
+            # Top up existing trailing newlines to exactly one blank line
+            tail = os.pread(fd, 2, max(0, size - 2))
+            prefix = ENTRY_SEPARATOR[:len(ENTRY_SEPARATOR) - (len(tail) - len(tail.rstrip(b"\n")))]
+        data = (prefix + ENTRY_SEPARATOR.join(entries)).encode("utf-8")
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+        return len(data)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, content: Union[str, bytes]) -> int:
+    """
+    Replaces ``path`` with ``content`` via a fsynced temp file and rename, so
+    readers see either the old or the new file, never a partial one.
+
+    Returns:
+        The number of bytes written.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+def splice_file(path: str, start: int, end: int, replacement: bytes) -> int:
+    """
+    Replaces bytes ``[start, end)`` of ``path`` with ``replacement`` atomically.
+
+    The untouched prefix and suffix are copied into a fsynced temp file (in
+    the kernel where ``os.copy_file_range`` is available) and renamed over
+    ``path``, so the only bytes handled in Python are the replacement itself.
+
+    Returns:
+        The size of the new file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with open(path, "rb") as source, os.fdopen(fd, "wb") as target:
+            size = os.fstat(source.fileno()).st_size
+            if not 0 <= start <= end <= size:
+                raise ValueError(f"Invalid splice range {start}-{end} for {path} ({size} bytes)")
+            _copy_range(source, target, 0, start)
+            target.write(replacement)
+            _copy_range(source, target, end, size - end)
+            target.flush()
+            os.fsync(target.fileno())
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return start + len(replacement) + size - end
+
+
+def _copy_range(source, target, offset: int, count: int) -> None:
+    target.flush()
+    if hasattr(os, "copy_file_range"):
+        try:
+            while count > 0:
+                copied = os.copy_file_range(source.fileno(), target.fileno(), count, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+            return
+        except OSError:
+            # Unsupported across these filesystems; copy the remainder in Python
+            pass
+    source.seek(offset)
+    while count > 0:
+        chunk = source.read(min(count, COPY_CHUNK_BYTES))
+        if not chunk:
+            break
+        target.write(chunk)
+        count -= len(chunk)
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces bursts of memory appends into one write and fsync per file.
+
+    ``append`` only queues the entry; a flush runs on ``executor`` once
+    ``flush_interval`` seconds have passed since the first queued entry, or
+    immediately when more than ``max_pending_bytes`` are waiting. Readers call
+    ``flush`` first so they always observe their own writes.
+
+    Files are appended under the cross-process lock of their directory. With
+    a ``journal`` (see ``journal.JournalSet``), flushes append to the
+    directory journals instead and then drain them into the markdown files;
+    background flushes skip a drain another process is already running.
+    ``append_batch`` writes straight to the markdown files, since a batch is
+    flushed at once and gains nothing from the journal's extra fsyncs.
+
+    Journals are only drained while this process has records in them that
+    no drain has reached yet, or after ``request_drain`` (records another
+    process left behind), so reads with nothing queued never leave the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES,
+        on_write: Optional[Callable[[str], None]] = None,
+        journal=None,
+    ):
+        self.executor = executor
+        self.on_write = on_write
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.max_pending_bytes = max_pending_bytes
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_bytes = 0
+        # Set once entries are journaled, cleared once a drain reached every journal
+        self._undrained = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    async def append(self, path: str, entry: str) -> None:
+        """Queues ``entry`` for ``path`` and schedules a flush."""
+        with self._lock:
+            self._pending.setdefault(path, []).append(entry)
+            self._pending_bytes += len(entry)
+            over_budget = self._pending_bytes >= self.max_pending_bytes
+
+        if over_budget:
+            await self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, self._flush_in_background)
+
+    def request_drain(self) -> None:
+        """Has the next flush drain the journals, e.g. for records another process left behind."""
+        if self.journal is not None:
+            self._undrained = True
+
+    async def append_batch(self, entries: List[Tuple[str, str]]) -> int:
+        """Queues (path, entry) pairs and flushes them at once, one append and fsync per file; returns bytes written."""
+        with self._lock:
+            for path, entry in entries:
+                self._pending.setdefault(path, []).append(entry)
+                self._pending_bytes += len(entry)
+        return await self.flush(direct=True)
+
+    def _flush_in_background(self) -> None:
+        self._timer = None
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.flush_sync, False)
+        future.add_done_callback(self._log_flush_failure)
+
+    @staticmethod
+    def _log_flush_failure(future: "asyncio.Future") -> None:
+        if not future.cancelled() and future.exception():
+            logger.error(f"Background memory flush failed: {future.exception()}")
+
+    async def flush(self, direct: bool = False) -> int:
+        """Writes every queued entry to disk; returns the number of bytes written."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending and not self._flush_lock.locked() and not self._undrained:
+            return 0
+        # Also waits for an in-flight background flush to land
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.flush_sync, True, direct)
+
+    @contextmanager
+    def exclusive(self, path: Optional[str] = None) -> Iterator[None]:
+        """Blocks flushes, and other processes' writes to the directory of ``path``, while the caller rewrites files in place."""
+        with self._flush_lock:
+            if path is None:
+                yield
+                return
+            with files_lock(path):
+                yield
+
+    def flush_sync(self, wait: bool = True, direct: bool = False) -> int:
+        """
+        Blocking flush, used from worker threads and at shutdown.
+
+        With ``wait`` False, journals another process is draining are left
+        for the next flush instead of waiting for the lock. With ``direct``,
+        queued entries bypass the journal; anything already journaled is
+        drained first so entries still land in the order they were queued.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_bytes = 0
+            if direct and self._undrained:
+                self._drain(wait)
+            written = 0
+            items = list(pending.items())
+            for position, (path, entries) in enumerate(items):
+                try:
+                    if self.journal is not None and not direct:
+                        written += self.journal.append(path, entries)
+                        self._undrained = True
+                        continue
+                    with files_lock(path):
+                        written += append_entries(path, entries)
+                    if self.on_write is not None:
+                        self.on_write(path)
+                except OSError:
+                    # Put unwritten entries back so a later flush can retry them
+                    with self._lock:
+                        for failed_path, failed_entries in items[position:]:
+                            self._pending.setdefault(failed_path, [])[:0] = failed_entries
+                            self._pending_bytes += sum(len(entry) for entry in failed_entries)
+                    raise
+            if self._undrained and not direct:
+                self._drain(wait)
+            return written
+
+    def _drain(self, wait: bool) -> None:
+        # Cleared first so a request_drain arriving mid-drain is not lost
+        self._undrained = False
+        try:
+            drained, skipped = self.journal.drain(blocking=wait)
+        except BaseException:
+            self._undrained = True
+            raise
+        if skipped:
+            self._undrained = True
+        for path in drained:
+            if self.on_write is not None:
+                self.on_write(path)
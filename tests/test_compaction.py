@@ -0,0 +1,79 @@
+"""Duplicate handling of working-memory compaction."""
+
+from datetime import datetime
+
+from memory_mcp_server.archive import ColdArchive
+from memory_mcp_server.compaction import WorkingMemoryCompactor, compact_content
+
+CUTOFF = datetime(2026, 1, 1)
+
+NOTES = (
+    "# Working Memory\n\n"
+    "## 2026-03-01 10:00:00\npayments-service crashed on /api/v1/pay\n\n"
+    "## 2026-03-02 10:00:00\norders-service crashed on /api/v2/orders\n"
+)
+
+
+def test_notes_differing_by_path_both_survive():
+    result = compact_content(NOTES, CUTOFF)
+
+    assert result.near_merged == 0
+    assert "/api/v1/pay" in result.content
+    assert "/api/v2/orders" in result.content
+
+
+def test_notes_differing_by_quoted_value_both_survive():
+    content = (
+        "## 2026-03-01 10:00:00\nconfig key 'retries' is ignored\n\n"
+        "## 2026-03-02 10:00:00\nconfig key 'timeout' is ignored\n"
+    )
+    result = compact_content(content, CUTOFF)
+
+    assert "'retries'" in result.content
+    assert "'timeout'" in result.content
+
+
+def test_folded_near_duplicate_is_archived():
+    content = (
+        "## 2026-03-01 10:00:00\nbuild broke at commit 3fa9c2b1 on 2026-02-28 09:00:00\n\n"
+        "## 2026-03-02 10:00:00\nbuild broke at commit 77e0d4a9 on 2026-03-02 08:30:00\n"
+    )
+    result = compact_content(content, CUTOFF)
+
+    assert result.near_merged == 1
+    assert "77e0d4a9" in result.content
+    assert "_Consolidated: seen 2 times since 2026-03-01 10:00:00_" in result.content
+    assert [block.text for block in result.archived] == [
+        "## 2026-03-01 10:00:00\nbuild broke at commit 3fa9c2b1 on 2026-02-28 09:00:00\n\n"
+    ]
+
+
+def test_folded_exact_duplicate_is_archived():
+    content = (
+        "## 2026-03-01 10:00:00\nrestart the worker after deploys\n\n"
+        "## 2026-03-02 10:00:00\nrestart the worker after deploys\n"
+    )
+    result = compact_content(content, CUTOFF)
+
+    assert result.exact_merged == 1
+    assert len(result.archived) == 1
+    assert result.archived[0].timestamp == datetime(2026, 3, 1, 10)
+
+
+def test_compactor_keeps_every_note_in_file_or_archive(tmp_path):
+    path = tmp_path / "working-memory.md"
+    path.write_text(
+        NOTES + "\n## 2026-03-03 10:00:00\nOrders-service crashed on /api/v2/orders.\n",
+        encoding="utf-8",
+    )
+    archive = ColdArchive(str(tmp_path / "archive"))
+    compactor = WorkingMemoryCompactor(str(tmp_path / "state.json"), archive)
+
+    summary = compactor.compact(str(path), max_age_days=3650, now=datetime(2026, 3, 4))
+
+    remaining = path.read_text(encoding="utf-8")
+    archived = archive.load(list(range(summary["archived"])))
+    assert summary["exact_duplicates_merged"] + summary["near_duplicates_merged"] == 1
+    assert "/api/v1/pay" in remaining
+    assert [entry["timestamp"] for entry in archived] == ["2026-03-02 10:00:00"]
+    assert "orders-service crashed on /api/v2/orders" in archived[0]["content"]
@@ -0,0 +1,36 @@
+"""Section offsets of the keyword index on files that text mode would alter."""
+
+from memory_mcp_server.search import SearchIndex
+
+CONTENT = (
+    "# Notas\r\n"
+    "\r\n"
+    "## Decisões de arquitetura\r\n"
+    "- Índice persistido em JSON, sem serviço externo\r\n"
+    "\r\n"
+    "## Deployment\r\n"
+    "- Docker-first, imagem publicada no GHCR\r\n"
+)
+
+
+def test_crlf_and_non_ascii_sections_read_back_whole(tmp_path):
+    path = tmp_path / "project-knowledge.md"
+    path.write_bytes(CONTENT.encode("utf-8"))
+    index = SearchIndex(str(tmp_path / "search-index.json"))
+
+    assert index.refresh([str(path)]) == 1
+    results = index.search("docker", limit=1)
+
+    assert results[0]["heading"] == "Deployment"
+    assert results[0]["content"] == "## Deployment\r\n- Docker-first, imagem publicada no GHCR\r\n"
+
+
+def test_section_before_non_ascii_text_is_not_cut(tmp_path):
+    path = tmp_path / "project-knowledge.md"
+    path.write_bytes(CONTENT.encode("utf-8"))
+    index = SearchIndex(str(tmp_path / "search-index.json"))
+    index.refresh([str(path)])
+
+    content = index.search("persistido", limit=1)[0]["content"]
+
+    assert content == "## Decisões de arquitetura\r\n- Índice persistido em JSON, sem serviço externo\r\n\r\n"
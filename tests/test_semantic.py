@@ -0,0 +1,32 @@
+"""Section offsets of the vector index on files that text mode would alter."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from memory_mcp_server.semantic import VectorIndex, get_embedder  # noqa: E402
+
+CONTENT = (
+    "# Notas\r\n"
+    "\r\n"
+    "## Decisões de arquitetura\r\n"
+    "- Índice persistido em JSON, sem serviço externo\r\n"
+    "\r\n"
+    "## Deployment\r\n"
+    "- Docker-first, imagem publicada no GHCR\r\n"
+)
+
+
+def test_crlf_and_non_ascii_sections_read_back_whole(tmp_path):
+    path = tmp_path / "project-knowledge.md"
+    path.write_bytes(CONTENT.encode("utf-8"))
+    index = VectorIndex(str(tmp_path / "cache"), get_embedder())
+
+    assert index.refresh([str(path)]) == 1
+    deployment = index.search("docker deployment", limit=1)[0]
+    decisions = index.search("índice persistido arquitetura", limit=1)[0]
+
+    assert deployment["content"] == "## Deployment\r\n- Docker-first, imagem publicada no GHCR\r\n"
+    assert decisions["content"] == (
+        "## Decisões de arquitetura\r\n- Índice persistido em JSON, sem serviço externo\r\n\r\n"
+    )
@@ -0,0 +1,76 @@
+"""Pattern and decision counts of the stats manifest."""
+
+import os
+import re
+
+from memory_mcp_server.stats import StatsManifest, count_content
+
+SETUP_PROMPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "memory_mcp_server", "resources", "memory-setup.md")
+
+
+def template(file_name: str) -> str:
+    """Returns the markdown the setup prompt writes for ``file_name``."""
+    with open(SETUP_PROMPT, "r", encoding="utf-8") as f:
+        prompt = f.read()
+    match = re.search(rf"\*\*`[^`]*{re.escape(file_name)}`\*\*\n```markdown\n(.*?)\n```", prompt, re.DOTALL)
+    assert match, f"{file_name} template not found in the setup prompt"
+    return match.group(1) + "\n"
+
+
+def fill(content: str, heading: str, items: list) -> str:
+    """Adds list items below the placeholder comment of ``heading``."""
+    section = re.search(rf"^## {re.escape(heading)}\n<!--.*?-->\n", content, re.MULTILINE)
+    assert section, f"## {heading} not found in the template"
+    return content[:section.end()] + "".join(f"{item}\n" for item in items) + content[section.end():]
+
+
+def counts(content: str) -> dict:
+    data = content.encode("utf-8")
+    return count_content(data, content)
+
+
+def test_empty_templates_count_nothing():
+    for file_name in ("project-knowledge.md", "working-memory.md"):
+        result = counts(template(file_name))
+        assert result["patterns"] == 0
+        assert result["decisions"] == 0
+
+
+def test_project_knowledge_bullets_are_counted():
+    content = template("project-knowledge.md")
+    content = fill(content, "Architecture & Design Decisions", [
+        "- Use SQLite for the mirror: readers never block",
+        "- Keep markdown as the source of truth",
+    ])
+    content = fill(content, "Recurring Patterns", [
+        "- Retry transient HTTP errors with backoff",
+        "* Validate paths before touching the filesystem",
+        "  - nested detail, not a separate pattern",
+        "```python",
+        "- not a list item inside a fence",
+        "```",
+    ])
+    content = fill(content, "Coding Standards & Conventions", ["- snake_case everywhere"])
+
+    result = counts(content)
+
+    assert result["decisions"] == 2
+    assert result["patterns"] == 2
+
+
+def test_session_decisions_in_working_memory_are_counted():
+    content = fill(template("working-memory.md"), "Session Decisions", ["- Ship the fix behind a flag"])
+
+    assert counts(content)["decisions"] == 1
+
+
+def test_manifest_totals_include_bullets(tmp_path):
+    long_term = tmp_path / "long-term"
+    long_term.mkdir()
+    path = long_term / "project-knowledge.md"
+    path.write_text(fill(template("project-knowledge.md"), "Recurring Patterns", ["- Cache by stat signature"]), encoding="utf-8")
+    manifest = StatsManifest(str(tmp_path / "stats.json"))
+
+    manifest.reconcile([(str(path), "long-term", None)])
+
+    assert manifest.summary()["totals"]["patterns"] == 1
@@ -0,0 +1,28 @@
+"""Full-text search over the SQLite mirror."""
+
+import pytest
+
+from memory_mcp_server import store
+
+pytestmark = pytest.mark.skipif(not store.available(), reason="SQLite without FTS5")
+
+
+def test_heading_path_with_separator_text_round_trips(tmp_path):
+    path = tmp_path / "project-knowledge.md"
+    path.write_text(
+        "# Project Knowledge\n\n"
+        "## Pipelines\n\n"
+        "### build > test > deploy\n"
+        "- Cache wheels between the build and test stages\n",
+        encoding="utf-8",
+    )
+    mirror = store.SqliteMemoryStore(str(tmp_path / "memory.db"))
+    try:
+        assert mirror.sync([(str(path), "long-term", None)]) == 1
+        result = mirror.search("wheels", limit=1)[0]
+    finally:
+        mirror.close()
+
+    assert result["heading"] == "build > test > deploy"
+    assert result["heading_path"] == ["Pipelines", "build > test > deploy"]
+    assert result["content"].startswith("### build > test > deploy\n")